@@ -0,0 +1,263 @@
+"""
+Scrape eBay search results concurrently with async Playwright.
+
+Keeps several tabs in flight on one shared browser context, while a global
+politeness limiter spaces out navigations across all tabs. Returns the same
+Page/Title/Price/Sold Date/Link/Image Link rows as scrape_with_playwright.py.
+
+Usage:
+  python async_scraper.py --pages 20 --concurrency 4
+  python async_scraper.py --pages 5 --benchmark   # compare with sequential loop
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from playwright.async_api import async_playwright
+
+from browser_profile import context_options, launch_args
+from embedded_json import parse_listings
+from html_cache import HtmlCache
+from pagination import pages_for_count, plan_pages
+from page_readiness import AdaptiveDelay, async_wait_until_ready
+from resource_policy import ResourcePolicy
+from scrape_with_playwright import (
+    DEFAULT_QUERY,
+    build_search_url,
+    scrape_ebay_with_playwright,
+)
+
+OUTPUT_CSV = "ebay_playwright_async_results.csv"
+
+
+class PolitenessLimiter:
+    """
+    Global limit on how often any tab may start a navigation.
+    Each acquire waits until at least min_interval (+ random jitter)
+    has passed since the previous one, no matter which tab asked.
+    With an AdaptiveDelay the interval follows its AIMD delay instead.
+    Returns the seconds spent waiting.
+    """
+
+    def __init__(self, min_interval: float = 1.5, jitter: float = 1.0,
+                 adaptive: Optional[AdaptiveDelay] = None):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.adaptive = adaptive
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        async with self._lock:
+            wait = max(0.0, self._next_at - time.monotonic())
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if self.adaptive is not None:
+                interval = self.adaptive.next_delay()
+            else:
+                interval = self.min_interval + random.uniform(0, self.jitter)
+            self._next_at = time.monotonic() + interval
+            return wait
+
+
+def parse_page(html: str, page_num: int) -> Tuple[Optional[List[Dict]], bool]:
+    """
+    Parse one rendered results page into (rows, has_next).
+    rows is None when the page has no results list.
+    Reads the embedded listing JSON when present, otherwise walks the DOM.
+    """
+    return parse_listings(html, page_num)
+
+
+async def load_results_page(page, url: str, page_num: int, limiter,
+                            policy: Optional[ResourcePolicy] = None) -> bool:
+    """
+    Navigate an open tab to a results page; True once result cards are in the DOM
+    """
+    if policy is not None:
+        await policy.install_async(page)
+    slot_wait = await limiter.acquire()
+    nav_start = time.perf_counter()
+    response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+    ready = await async_wait_until_ready(page, response)
+    adaptive = getattr(limiter, 'adaptive', None)
+    if adaptive is not None:
+        adaptive.record(time.perf_counter() - nav_start, ok=ready['state'] == 'results')
+    print(f"⏱ Page {page_num}: waited {slot_wait:.2f}s for a slot, ready in {ready['wait']:.2f}s")
+    if policy is not None:
+        print(f"   {policy.report(page)}")
+    if ready['state'] != 'results':
+        print(f"⚠️ Could not find results on page {page_num} ({ready['state']})")
+        return False
+    return True
+
+
+async def fetch_page(context, page_num: int, limiter, query: str = DEFAULT_QUERY,
+                     params: Optional[List[str]] = None,
+                     policy: Optional[ResourcePolicy] = None,
+                     cache: Optional[HtmlCache] = None) -> Optional[str]:
+    """
+    Open a tab, load one results page and return its HTML (None if no results).
+    A fresh copy in the cache is returned without touching the network.
+    """
+    url = build_search_url(page_num, query, params)
+    if cache is not None:
+        cached_html = cache.get(url)
+        if cached_html is not None:
+            print(f"✓ Page {page_num}: using cached copy")
+            return cached_html
+
+    page = await context.new_page()
+    try:
+        if not await load_results_page(page, url, page_num, limiter, policy):
+            return None
+        html = await page.content()
+        if cache is not None:
+            cache.put(url, html)
+        return html
+    finally:
+        await page.close()
+
+
+async def scrape_ebay_async(max_pages: int = 3, concurrency: int = 4, min_interval: float = 1.5,
+                            query: str = DEFAULT_QUERY, params: Optional[List[str]] = None,
+                            headless: bool = True, block_resources: bool = True,
+                            use_cache: bool = True, extract: str = "html") -> List[Dict]:
+    """
+    Scrape pages 1..max_pages of one query with up to `concurrency` tabs open.
+    Page 1 is fetched first: its result count (see pagination.py) caps the plan,
+    then the remaining pages are dispatched together. Pages past the last one
+    (no "next" link) are skipped or dropped, and so are the pages after one that
+    fails, so the result never has a hole.
+    extract: "html" parses page.content() in Python; "browser" pulls the card
+    fields out with one page.evaluate() (see browser_extract.py)
+    """
+    if extract == "browser":
+        from browser_extract import fetch_rows
+    policy = ResourcePolicy.load() if block_resources else None
+    cache = HtmlCache() if use_cache else None
+    tabs = asyncio.Semaphore(concurrency)
+    limiter = PolitenessLimiter(min_interval, adaptive=AdaptiveDelay(initial=2 * min_interval, min_delay=min_interval))
+    last_page = max_pages
+
+    async with async_playwright() as p:
+        print(f"Launching browser ({concurrency} tabs)...")
+        browser = await p.chromium.launch(
+            headless=headless,
+            args=launch_args()
+        )
+        context = await browser.new_context(**context_options())
+
+        async def worker(page_num: int) -> Tuple[int, List[Dict]]:
+            nonlocal last_page
+            async with tabs:
+                if page_num > last_page:
+                    return page_num, []
+                try:
+                    planned = None
+                    if extract == "browser":
+                        rows, has_next, total = await fetch_rows(context, page_num, limiter, query, params,
+                                                                 policy, cache)
+                        if page_num == 1:
+                            planned = pages_for_count(total, params, max_pages)
+                    else:
+                        html = await fetch_page(context, page_num, limiter, query, params, policy, cache)
+                        if html is None:
+                            last_page = min(last_page, page_num - 1)
+                            return page_num, []
+                        # Parse off the event loop so the other tabs keep moving
+                        rows, has_next = await asyncio.to_thread(parse_page, html, page_num)
+                        if page_num == 1:
+                            planned = plan_pages(html, params, max_pages)
+                    if planned is not None:
+                        print(f"✓ Plan: {planned} page(s) for {query}")
+                        last_page = min(last_page, planned)
+                except Exception as e:
+                    # Stop at the failed page like the sequential loop, instead of leaving a hole
+                    print(f"❌ Error on page {page_num}: {e} - keeping pages 1-{page_num - 1} only")
+                    last_page = min(last_page, page_num - 1)
+                    return page_num, []
+                if rows is None:
+                    print(f"❌ No results list found on page {page_num}")
+                    last_page = min(last_page, page_num - 1)
+                    return page_num, []
+                if not has_next:
+                    last_page = min(last_page, page_num)
+                print(f"✓ Extracted {len(rows)} items from page {page_num}")
+                return page_num, rows
+
+        results = [await worker(1)]
+        results += await asyncio.gather(*(worker(n) for n in range(2, last_page + 1)))
+        await browser.close()
+    if cache is not None:
+        cache.close()
+
+    all_items = []
+    for page_num, rows in sorted(results, key=lambda r: r[0]):
+        if page_num <= last_page:
+            all_items.extend(rows)
+    return all_items
+
+
+def benchmark(max_pages: int = 5, concurrency: int = 4, min_interval: float = 1.5, headless: bool = True) -> None:
+    """
+    Time the sequential loop against the async mode on the same query.
+    Every run goes to the network (no HTML cache, no checkpoint resume) with the same headless setting.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    seq_items = scrape_ebay_with_playwright(max_pages=max_pages, use_cache=False, checkpoint=False, headless=headless)
+    timings['sequential'] = (time.perf_counter() - start, len(seq_items))
+
+    start = time.perf_counter()
+    async_items = asyncio.run(scrape_ebay_async(max_pages, concurrency, min_interval,
+                                                headless=headless, use_cache=False))
+    timings[f'async x{concurrency}'] = (time.perf_counter() - start, len(async_items))
+
+    start = time.perf_counter()
+    browser_items = asyncio.run(scrape_ebay_async(max_pages, concurrency, min_interval,
+                                                  headless=headless, use_cache=False, extract="browser"))
+    timings[f'async x{concurrency} (in-browser extract)'] = (time.perf_counter() - start, len(browser_items))
+
+    print(f"\n{'='*60}")
+    print(f"BENCHMARK ({max_pages} pages)")
+    print(f"{'='*60}")
+    for mode, (elapsed, n_items) in timings.items():
+        print(f"  {mode:<34} {elapsed:7.1f}s  {n_items:5d} items  {max_pages / elapsed:.2f} pages/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape eBay results with concurrent Playwright tabs.")
+    parser.add_argument("--pages", type=int, default=3, help="Number of pages to scrape (default: 3)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Tabs in flight at once (default: 4)")
+    parser.add_argument("--min-interval", type=float, default=1.5,
+                        help="Floor for the adaptive delay between navigations (default: 1.5)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--extract", choices=["html", "browser"], default="html",
+                        help="Parse page.content() in Python, or extract cards in the browser (default: html)")
+    parser.add_argument("--benchmark", action="store_true", help="Compare against the sequential loop")
+    parser.add_argument("--out", "-o", type=str, default=OUTPUT_CSV, help=f"Output CSV (default: {OUTPUT_CSV})")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.pages, args.concurrency, args.min_interval, headless=not args.headed)
+        return
+
+    items = asyncio.run(scrape_ebay_async(args.pages, args.concurrency, args.min_interval,
+                                          headless=not args.headed, extract=args.extract))
+    if not items:
+        print("\n❌ No items scraped")
+        return
+
+    df = pd.DataFrame(items)
+    df.to_csv(args.out, index=False)
+    print(f"\n✅ Scraped {len(items)} items -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+In-browser extraction: one page.evaluate() call pulls the card fields out of the
+live DOM and returns compact JSON, instead of serializing the ~5 MB DOM with
+page.content() and rebuilding it with BeautifulSoup.
+
+EXTRACT_JS mirrors scrape_with_playwright.extract_page_items field by field.
+The full HTML is only captured (and parsed the old way) when the in-browser
+extraction comes back empty; a fresh copy of such a page in the HTML cache is
+used without opening a tab. EXTRACT_JS also returns the count heading so page 1
+can be planned (see pagination.py) without page.content().
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from async_scraper import load_results_page, parse_page
+from html_cache import HtmlCache
+from pagination import count_from_text, result_count
+from resource_policy import ResourcePolicy
+from scrape_with_playwright import DEFAULT_QUERY, build_search_url
+
+EXTRACT_JS = r"""
+() => {
+    // Same as BeautifulSoup get_text(strip=True): trimmed text nodes joined with ''
+    const stripText = (el) => {
+        const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+        const parts = [];
+        while (walker.nextNode()) {
+            const t = walker.currentNode.nodeValue.trim();
+            if (t) parts.push(t);
+        }
+        return parts.join('');
+    };
+    const list = document.querySelector('ul.srp-results');
+    if (!list) return null;
+
+    const items = [];
+    for (const li of list.querySelectorAll('li')) {
+        const heading = li.querySelector('div[role="heading"]');
+        if (!heading) continue;
+        const title = stripText(heading).replace('Opens in a new window or tab', '').trim();
+        if (!title || title.length < 10) continue;
+
+        const priceEl = li.querySelector('span.s-card__price');
+        const spans = Array.from(li.querySelectorAll('span'));
+        const soldEl = li.querySelector('span.POSITIVE') ||
+            spans.find(s => s.childNodes.length === 1 && (s.textContent || '').includes('Sold')) ||
+            spans.find(s => Array.from(s.classList).join(' ').toLowerCase().includes('sold'));
+        const linkEl = Array.from(li.querySelectorAll('a[href]')).find(a => a.getAttribute('href').includes('/itm/'));
+        if (!linkEl) continue;
+        const img = li.querySelector('img');
+
+        items.push({
+            title: title,
+            price: priceEl ? stripText(priceEl) : 'N/A',
+            sold: soldEl ? stripText(soldEl) : 'N/A',
+            link: linkEl.getAttribute('href').split('?')[0],
+            image: img && img.hasAttribute('src') ? img.getAttribute('src') : 'N/A',
+        });
+    }
+
+    const next = document.querySelector('a.pagination__next');
+    const hasNext = !!next && !next.classList.contains('pagination__next--disabled');
+    const count = document.querySelector('h1.srp-controls__count-heading span.BOLD');
+    return {items: items, hasNext: hasNext, count: count ? count.textContent : null};
+}
+"""
+
+
+def rows_from_payload(payload: Dict, page_num: int) -> List[Dict]:
+    """
+    Map EXTRACT_JS output to our row schema
+    """
+    return [
+        {
+            'Page': page_num,
+            'Title': item['title'],
+            'Price': item['price'],
+            'Sold Date': item['sold'],
+            'Link': item['link'],
+            'Image Link': item['image'],
+        }
+        for item in payload['items']
+    ]
+
+
+async def extract_in_browser(page, page_num: int) -> Tuple[Optional[List[Dict]], bool, Optional[int]]:
+    """
+    (rows, has_next, result count) from the live DOM; rows is None if there is no results list
+    """
+    payload = await page.evaluate(EXTRACT_JS)
+    if payload is None:
+        return None, False, None
+    return rows_from_payload(payload, page_num), payload['hasNext'], count_from_text(payload['count'])
+
+
+def rows_from_html(html: str, page_num: int) -> Tuple[Optional[List[Dict]], bool, Optional[int]]:
+    rows, has_next = parse_page(html, page_num)
+    return rows, has_next, result_count(html)
+
+
+async def fetch_rows(context, page_num: int, limiter, query: str = DEFAULT_QUERY,
+                     params: Optional[List[str]] = None, policy: Optional[ResourcePolicy] = None,
+                     cache: Optional[HtmlCache] = None) -> Tuple[Optional[List[Dict]], bool, Optional[int]]:
+    """
+    Load one results page and extract its rows in the browser: (rows, has_next, result count).
+    A fresh cached copy is parsed without opening a tab. Falls back to
+    page.content() + parse_page (and caches that HTML) only when the in-browser
+    extraction finds nothing.
+    """
+    url = build_search_url(page_num, query, params)
+    if cache is not None:
+        cached_html = cache.get(url)
+        if cached_html is not None:
+            print(f"✓ Page {page_num}: using cached copy")
+            return rows_from_html(cached_html, page_num)
+
+    page = await context.new_page()
+    try:
+        if not await load_results_page(page, url, page_num, limiter, policy):
+            return None, False, None
+        rows, has_next, total = await extract_in_browser(page, page_num)
+        if rows:
+            return rows, has_next, total
+        print(f"⚠️ In-browser extraction found nothing on page {page_num}, capturing HTML")
+        html = await page.content()
+    finally:
+        await page.close()
+
+    if cache is not None:
+        cache.put(url, html)
+    return rows_from_html(html, page_num)
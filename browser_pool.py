@@ -0,0 +1,207 @@
+"""
+Warm, persistent browser contexts that crawl jobs borrow and give back.
+
+Each pool slot is a Chromium persistent context (launched with the low-footprint
+profile from browser_profile.py) with its own profile directory under
+browser_profiles/, so the HTTP disk cache and cookies survive between runs.
+On close, each slot also writes its storage_state to
+browser_profiles/slot_N/storage_state.json.
+
+Two ways to use it:
+  - in-process: BrowserPool.start() launches and warms the slots itself
+  - as a service: `python browser_pool.py serve --size 4` keeps the browsers up
+    (exposed over CDP) and writes their endpoints to browser_pool.json;
+    BrowserPool.connect() then attaches with no launch cost. Borrowing is only
+    exclusive within one process, so only one client process may attach at a
+    time. Chromium also refuses a second process on a profile directory that is
+    in use, so concurrent clients that launch their own pools need their own
+    profile_root (work_queue.py workers do both: attach=False and a root per
+    worker slot).
+"""
+
+import argparse
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List, Optional
+
+from playwright.async_api import async_playwright
+
+from browser_profile import context_options, launch_args, pool_size_for_budget
+
+PROFILE_ROOT = Path(__file__).resolve().parent / "browser_profiles"
+ENDPOINTS_FILE = PROFILE_ROOT / "browser_pool.json"
+WARM_URL = "https://www.ebay.com/"
+BASE_DEBUG_PORT = 9300
+
+
+class BrowserPool:
+    """
+    A fixed set of warm browser contexts.
+      async with pool.lease() as context:
+          page = await context.new_page()
+    """
+
+    def __init__(self, size: int = 2, profile_root: Path = PROFILE_ROOT, headless: bool = True,
+                 warm_url: Optional[str] = WARM_URL, low_footprint: bool = True):
+        self.size = size
+        self.profile_root = Path(profile_root)
+        self.headless = headless
+        self.low_footprint = low_footprint
+        self.warm_url = warm_url
+        self._contexts: List = []
+        self._browsers: List = []  # only set when attached to a running service
+        self._idle: asyncio.Queue = asyncio.Queue()
+
+    def slot_dir(self, slot: int) -> Path:
+        return self.profile_root / f"slot_{slot}"
+
+    async def _launch_slot(self, playwright, slot: int, debug_port: Optional[int] = None):
+        args = launch_args(self.low_footprint)
+        if debug_port:
+            args.append(f'--remote-debugging-port={debug_port}')
+        self.slot_dir(slot).mkdir(parents=True, exist_ok=True)
+        return await playwright.chromium.launch_persistent_context(
+            str(self.slot_dir(slot) / "profile"),
+            headless=self.headless,
+            args=args,
+            **context_options(self.low_footprint),
+        )
+
+    async def _warm(self, context) -> None:
+        if not self.warm_url:
+            return
+        page = await context.new_page()
+        try:
+            await page.goto(self.warm_url, wait_until="domcontentloaded", timeout=30000)
+        except Exception as e:
+            print(f"⚠️ Warm-up failed: {e}")
+        finally:
+            await page.close()
+
+    async def start(self, playwright, debug_ports: bool = False) -> "BrowserPool":
+        """
+        Launch and warm every slot in this process
+        """
+        print(f"Launching {self.size} warm browser contexts...")
+        self._contexts = await asyncio.gather(*(
+            self._launch_slot(playwright, slot, BASE_DEBUG_PORT + slot if debug_ports else None)
+            for slot in range(self.size)
+        ))
+        await asyncio.gather(*(self._warm(c) for c in self._contexts))
+        for context in self._contexts:
+            self._idle.put_nowait(context)
+        return self
+
+    async def connect(self, playwright, endpoints_file: Path = ENDPOINTS_FILE) -> "BrowserPool":
+        """
+        Attach to the browsers kept up by `browser_pool.py serve`
+        """
+        endpoints = json.loads(Path(endpoints_file).read_text(encoding="utf-8"))["endpoints"]
+        for endpoint in endpoints[:self.size]:
+            browser = await playwright.chromium.connect_over_cdp(endpoint)
+            self._browsers.append(browser)
+            self._contexts.append(browser.contexts[0])
+        for context in self._contexts:
+            self._idle.put_nowait(context)
+        print(f"Attached to {len(self._contexts)} pooled browsers")
+        return self
+
+    async def borrow(self):
+        return await self._idle.get()
+
+    async def give_back(self, context) -> None:
+        # Leave the context clean for the next job, but keep cache and cookies
+        for page in list(context.pages):
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self._idle.put_nowait(context)
+
+    @asynccontextmanager
+    async def lease(self):
+        context = await self.borrow()
+        try:
+            yield context
+        finally:
+            await self.give_back(context)
+
+    async def close(self) -> None:
+        """
+        Save each slot's storage_state, then close (or detach from) the browsers
+        """
+        for slot, context in enumerate(self._contexts):
+            try:
+                await context.storage_state(path=str(self.slot_dir(slot) / "storage_state.json"))
+            except Exception as e:
+                print(f"⚠️ Could not save storage state for slot {slot}: {e}")
+        if self._browsers:
+            for browser in self._browsers:
+                await browser.close()
+        else:
+            for context in self._contexts:
+                await context.close()
+        self._contexts, self._browsers = [], []
+
+
+@asynccontextmanager
+async def open_pool(playwright, size: int = 2, headless: bool = True, endpoints_file: Path = ENDPOINTS_FILE,
+                    profile_root: Path = PROFILE_ROOT, attach: bool = True):
+    """
+    Attach to a running pool service if there is one (and attach is set),
+    otherwise launch a local pool with its profiles under profile_root
+    """
+    pool = BrowserPool(size, profile_root=profile_root, headless=headless)
+    attached = False
+    if attach and Path(endpoints_file).exists():
+        try:
+            await pool.connect(playwright, endpoints_file)
+            attached = True
+        except Exception as e:
+            print(f"⚠️ Pool service not reachable ({e}), launching locally")
+            pool = BrowserPool(size, profile_root=profile_root, headless=headless)
+    if not attached:
+        await pool.start(playwright)
+    try:
+        yield pool
+    finally:
+        await pool.close()
+
+
+async def serve(size: int, headless: bool) -> None:
+    """
+    Keep `size` warm browsers running until interrupted
+    """
+    async with async_playwright() as p:
+        pool = BrowserPool(size, headless=headless)
+        await pool.start(p, debug_ports=True)
+        endpoints = [f"http://127.0.0.1:{BASE_DEBUG_PORT + slot}" for slot in range(size)]
+        ENDPOINTS_FILE.write_text(json.dumps({"endpoints": endpoints}, indent=2), encoding="utf-8")
+        print(f"✓ Serving {size} browsers, endpoints in {ENDPOINTS_FILE}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            ENDPOINTS_FILE.unlink(missing_ok=True)
+            await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-lived warm browser pool.")
+    parser.add_argument("command", choices=["serve"], help="serve: keep warm browsers running")
+    parser.add_argument("--size", type=int, default=2, help="Number of browser slots (default: 2)")
+    parser.add_argument("--memory-budget", type=float, default=0,
+                        help="Size the pool to this many MB instead of --size (see browser_profile.py)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser windows")
+    args = parser.parse_args()
+
+    size = pool_size_for_budget(args.memory_budget) if args.memory_budget else args.size
+    try:
+        asyncio.run(serve(size, headless=not args.headed))
+    except KeyboardInterrupt:
+        print("\nPool stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Low-footprint Chromium profile and memory-budgeted pool sizing.
+
+The low-footprint profile runs headless at 1280x800 with GPU, extensions,
+background networking, sync and translate off, service workers
+blocked and at most RENDERER_LIMIT renderer processes per browser. Results pages
+render the same; it just costs a fraction of the RAM/CPU of a headed 1920x1080
+window.
+
+Pool sizing: `measure` launches a few pool slots with the profile, loads a
+results page in each and records the resident memory (RSS of the browser
+process tree) per slot in browser_profiles/pool_sizing.json. pool_size_for_budget()
+then turns a memory budget into a slot count. RSS comes from psutil when it is
+installed, otherwise from /proc (Linux); on other systems without psutil (macOS)
+`measure` can't run and pool sizing keeps DEFAULT_SLOT_MB.
+
+Usage:
+  python browser_profile.py measure --samples 3
+  python browser_profile.py size --budget-mb 4096
+  python crawl_scheduler.py catalog_jobs.json --memory-budget 4096
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from playwright.async_api import async_playwright
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PROFILE_DIR = Path(__file__).resolve().parent / "browser_profiles"
+SIZING_FILE = PROFILE_DIR / "pool_sizing.json"
+
+RENDERER_LIMIT = 2
+LOW_FOOTPRINT_VIEWPORT = {'width': 1280, 'height': 800}
+FULL_VIEWPORT = {'width': 1920, 'height': 1080}
+
+LOW_FOOTPRINT_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--mute-audio',
+    '--no-first-run',
+    # Site isolation stays on: results pages run third-party ad and tracker scripts
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+    f'--renderer-process-limit={RENDERER_LIMIT}',
+    '--js-flags=--max-old-space-size=512',
+]
+
+# Used until `measure` has been run on this machine
+DEFAULT_SLOT_MB = 400
+
+
+def launch_args(low_footprint: bool = True) -> List[str]:
+    return list(LOW_FOOTPRINT_ARGS) if low_footprint else ['--disable-blink-features=AutomationControlled']
+
+
+def context_options(low_footprint: bool = True) -> Dict:
+    """
+    Keyword arguments for new_context / launch_persistent_context
+    """
+    from scrape_with_playwright import USER_AGENT  # that module imports this one
+
+    if not low_footprint:
+        return {'viewport': FULL_VIEWPORT, 'user_agent': USER_AGENT}
+    return {
+        'viewport': LOW_FOOTPRINT_VIEWPORT,
+        'user_agent': USER_AGENT,
+        'device_scale_factor': 1,
+        'reduced_motion': 'reduce',
+        'service_workers': 'block',
+    }
+
+
+# ----- memory -----
+def _proc_children() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # Fields after the ")" closing the command name: state, ppid, ...
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+    return children
+
+
+def _proc_rss(pid: int) -> int:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def descendant_rss(pid: Optional[int] = None) -> Optional[int]:
+    """
+    Bytes resident in every descendant of `pid` (default: this process), i.e.
+    the Playwright driver and the browsers it launched. None when neither
+    psutil nor /proc is available.
+    """
+    pid = os.getpid() if pid is None else pid
+    if psutil is not None:
+        total = 0
+        for child in psutil.Process(pid).children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return total
+    if not Path("/proc").is_dir():
+        return None
+    children = _proc_children()
+    total, stack = 0, list(children.get(pid, []))
+    while stack:
+        child = stack.pop()
+        total += _proc_rss(child)
+        stack.extend(children.get(child, []))
+    return total
+
+
+async def measure_slot_rss(url: Optional[str] = None, samples: int = 3, headless: bool = True,
+                           low_footprint: bool = True) -> Dict:
+    """
+    Launch `samples` pool slots in a scratch profile dir, load a results page in
+    each and return the per-slot RSS in MB
+    """
+    from browser_pool import BrowserPool
+    from page_readiness import async_wait_until_ready
+    from scrape_with_playwright import build_search_url
+
+    if descendant_rss() is None:
+        raise RuntimeError("Can't read process memory without /proc; install psutil: pip install psutil")
+    url = url or build_search_url(1)
+    async with async_playwright() as p:
+        baseline = descendant_rss()
+        with tempfile.TemporaryDirectory() as scratch:
+            pool = BrowserPool(samples, profile_root=Path(scratch), headless=headless, warm_url=None,
+                               low_footprint=low_footprint)
+            await pool.start(p)
+            pages = []
+            for context in pool._contexts:
+                page = await context.new_page()
+                response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                await async_wait_until_ready(page, response)
+                pages.append(page)
+            loaded = descendant_rss()
+            for page in pages:
+                await page.close()
+            await pool.close()
+    per_slot = (loaded - baseline) / samples / 1024 / 1024
+    return {
+        "per_slot_mb": round(per_slot, 1),
+        "samples": samples,
+        "low_footprint": low_footprint,
+        "url": url,
+        "source": "psutil" if psutil is not None else "/proc",
+        "measured_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def load_measurement(path: Path = SIZING_FILE) -> Optional[Dict]:
+    if Path(path).exists():
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    return None
+
+
+def pool_size_for_budget(budget_mb: float, per_slot_mb: Optional[float] = None, headroom: float = 0.15,
+                         max_size: int = 16) -> int:
+    """
+    Slots that fit in budget_mb, keeping `headroom` of it free for the Python
+    side; per_slot_mb defaults to the saved measurement (or DEFAULT_SLOT_MB)
+    """
+    if per_slot_mb is None:
+        measurement = load_measurement()
+        per_slot_mb = measurement["per_slot_mb"] if measurement else DEFAULT_SLOT_MB
+    usable = budget_mb * (1 - headroom)
+    return max(1, min(max_size, int(usable // per_slot_mb)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure browser memory and size the pool to a budget.")
+    parser.add_argument("command", choices=["measure", "size"])
+    parser.add_argument("--samples", type=int, default=3, help="measure: slots to launch (default: 3)")
+    parser.add_argument("--url", type=str, default=None, help="measure: page to load (default: a results page)")
+    parser.add_argument("--full", action="store_true", help="measure: use the old 1920x1080 profile")
+    parser.add_argument("--headed", action="store_true", help="measure: show the browser windows")
+    parser.add_argument("--budget-mb", type=float, default=4096, help="size: memory budget (default: 4096)")
+    args = parser.parse_args()
+
+    if args.command == "measure":
+        try:
+            result = asyncio.run(measure_slot_rss(args.url, args.samples, not args.headed, not args.full))
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        SIZING_FILE.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"✓ {result['per_slot_mb']:.0f} MB per slot ({result['source']}), saved to {SIZING_FILE.name}")
+    else:
+        measurement = load_measurement()
+        per_slot = measurement["per_slot_mb"] if measurement else DEFAULT_SLOT_MB
+        if measurement is None:
+            print(f"⚠️ No measurement yet (run `measure`), assuming {DEFAULT_SLOT_MB} MB per slot")
+        print(f"✓ {pool_size_for_budget(args.budget_mb, per_slot)} slots fit in {args.budget_mb:.0f} MB "
+              f"at {per_slot:.0f} MB each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Streaming card-by-card parser for results pages.
+
+CardStream is an html.parser.HTMLParser fed chunk by chunk. It never builds a
+tree: it keeps the stack of open tags and, for each <li> under the first
+ul.srp-results, the handful of fields parser_backends reads from a card
+({title, price, sold, link, image}). A card is handed out as soon as its </li>
+is seen, so memory stays at one card (plus the chunk being fed) however big the
+page is, and a page can be parsed while it is still downloading.
+
+The cards are the same ones the tree backends produce - same BeautifulSoup
+rules for get_text(strip=True), .string, first-match order and nested <li> - so
+parser_backends.listing_rows / saved_page_rows turn them into identical records.
+
+Usage:
+  python card_stream.py playwright_rendered.html ebay_iphone.html   # parity, timing and peak memory
+"""
+
+import sys
+import time
+import tracemalloc
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from parser_backends import Card, listing_rows
+
+CHUNK_SIZE = 64 * 1024
+
+# Tags BeautifulSoup's html.parser builder closes immediately
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem', 'meta',
+    'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex',
+    'nextid', 'spacer',
+}
+# Their text is left out of get_text()
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+
+class _Element:
+    __slots__ = ('tag', 'seq', 'children', 'string', 'watchers')
+
+    def __init__(self, tag: str, seq: int):
+        self.tag = tag
+        self.seq = seq
+        self.children = 0
+        self.string: Optional[str] = None  # .string of the single child
+        self.watchers: List = []  # (card, field) collecting this element's text
+
+
+class _OpenCard:
+    __slots__ = ('seq', 'element', 'fields', 'text', 'sold_seq', 'sold_text')
+
+    def __init__(self, seq: int, element: _Element):
+        self.seq = seq
+        self.element = element
+        self.fields: Dict[str, Optional[str]] = {
+            'title': None, 'price': None, 'positive': None, 'link': None, 'image': None,
+        }
+        self.text: Dict[str, List[str]] = {}
+        self.sold_seq: Optional[int] = None
+        self.sold_text: Optional[str] = None
+
+    def card(self) -> Card:
+        f = self.fields
+        return {
+            'title': f['title'],
+            'price': f['price'],
+            'sold': f['positive'] if f['positive'] is not None else self.sold_text,
+            'link': f['link'],
+            'image': f['image'],
+        }
+
+
+class CardStream(HTMLParser):
+    """
+    feed(chunk) -> cards finished in that chunk; close() -> the rest.
+    found_list / has_next / card_count describe the page once it has been fed completely.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found_list = False
+        self.has_next = False
+        self.card_count = 0
+        self._seen_next = False
+        self._stack: List[_Element] = []
+        self._seq = 0
+        self._data: List[str] = []
+        self._results: Optional[_Element] = None
+        self._list_done = False
+        self._cards: List[_OpenCard] = []
+        self._finished: List[_OpenCard] = []
+        self._ready: List[Card] = []
+
+    def feed(self, data: str) -> List[Card]:
+        super().feed(data)
+        ready, self._ready = self._ready, []
+        return ready
+
+    def close(self) -> List[Card]:
+        super().close()
+        self._flush_data()
+        while self._stack:
+            self._close_top()
+        ready, self._ready = self._ready, []
+        return ready
+
+    # ----- text -----
+    def handle_data(self, data: str) -> None:
+        self._data.append(data)
+
+    def _flush_data(self) -> None:
+        # BeautifulSoup joins adjacent data into one string before stripping it
+        if not self._data:
+            return
+        text = ''.join(self._data)
+        self._data = []
+        if not self._stack:
+            return
+        parent = self._stack[-1]
+        parent.children += 1
+        parent.string = text
+        stripped = text.strip()
+        if stripped and parent.tag not in NON_TEXT_TAGS:
+            for element in self._stack:
+                for card, field in element.watchers:
+                    card.text[field].append(stripped)
+
+    def handle_comment(self, data: str) -> None:
+        self._flush_data()
+        if self._stack:
+            self._stack[-1].children += 1
+            self._stack[-1].string = None
+
+    # ----- tags -----
+    def handle_starttag(self, tag: str, attrs) -> None:
+        self._flush_data()
+        attrs = {name: '' if value is None else value for name, value in attrs}
+        classes = attrs.get('class', '').split()
+        self._seq += 1
+        element = _Element(tag, self._seq)
+
+        if tag == 'a' and not self._seen_next and 'pagination__next' in classes:
+            self._seen_next = True
+            self.has_next = 'pagination__next--disabled' not in classes
+        if tag == 'ul' and self._results is None and not self._list_done and 'srp-results' in classes:
+            self._results = element
+            self.found_list = True
+        elif tag == 'li' and self._results is not None:
+            self._cards.append(_OpenCard(self._seq, element))
+
+        for card in self._cards:
+            fields = card.fields
+            if tag == 'div' and attrs.get('role') == 'heading' and 'title' not in card.text:
+                self._watch(card, element, 'title')
+            elif tag == 'span':
+                if 's-card__price' in classes and 'price' not in card.text:
+                    self._watch(card, element, 'price')
+                if 'POSITIVE' in classes and 'positive' not in card.text:
+                    self._watch(card, element, 'positive')
+            elif tag == 'a' and fields['link'] is None and '/itm/' in attrs.get('href', ''):
+                fields['link'] = attrs['href']
+            elif tag == 'img' and fields['image'] is None:
+                fields['image'] = attrs.get('src', 'N/A')
+
+        self._stack.append(element)
+        if tag in VOID_TAGS:
+            self._close_top()
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self._flush_data()
+            self._close_top()
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush_data()
+        if tag in VOID_TAGS:
+            return
+        # Like BeautifulSoup: close everything up to the nearest open <tag>, or ignore it
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i].tag == tag:
+                while len(self._stack) > i:
+                    self._close_top()
+                return
+
+    @staticmethod
+    def _watch(card: _OpenCard, element: _Element, field: str) -> None:
+        card.text[field] = []
+        element.watchers.append((card, field))
+
+    def _close_top(self) -> None:
+        element = self._stack.pop()
+        for card, field in element.watchers:
+            card.fields[field] = ''.join(card.text[field])
+        if element.tag == 'span' and element.children == 1 and element.string and 'Sold' in element.string:
+            for card in self._cards:
+                if card.seq < element.seq and (card.sold_seq is None or element.seq < card.sold_seq):
+                    card.sold_seq, card.sold_text = element.seq, element.string.strip()
+        if self._stack:
+            parent = self._stack[-1]
+            parent.children += 1
+            parent.string = element.string if element.children == 1 else None
+        if self._cards and self._cards[-1].element is element:
+            self._finished.append(self._cards.pop())
+            self.card_count += 1
+            if not self._cards:
+                # Nested <li> close first; hand cards out in document order like find_all
+                self._finished.sort(key=lambda card: card.seq)
+                self._ready.extend(card.card() for card in self._finished)
+                self._finished = []
+        if element is self._results:
+            self._results = None
+            self._list_done = True
+
+
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def response_chunks(response, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Text chunks of a requests response opened with stream=True, as they arrive
+    """
+    if response.encoding is None:
+        response.encoding = 'utf-8'
+    yield from response.iter_content(chunk_size=chunk_size, decode_unicode=True)
+
+
+def iter_cards(chunks: Iterable[str], stream: Optional[CardStream] = None) -> Iterator[Card]:
+    """
+    Cards as each one closes; pass a CardStream to read found_list / has_next afterwards
+    """
+    stream = stream or CardStream()
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    yield from stream.close()
+
+
+def iter_listing_rows(chunks: Iterable[str], page_num: int) -> Iterator[Dict]:
+    """
+    Records as scrape_with_playwright.extract_page_items builds them, one card at a time
+    """
+    for card in iter_cards(chunks):
+        yield from listing_rows([card], page_num)
+
+
+def main():
+    from parser_backends import parse_listing_page
+
+    paths = sys.argv[1:] or ["playwright_rendered.html", "ebay_iphone.html"]
+    different = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            html = f.read()
+        reference = parse_listing_page(html, 1, subtree=False)
+
+        start = time.perf_counter()
+        stream = CardStream()
+        cards = list(iter_cards(read_chunks(path), stream))
+        rows = listing_rows(cards if stream.found_list else None, 1)
+        elapsed = time.perf_counter() - start
+        verdict = "identical" if (rows, stream.has_next) == reference else "❌ DIFFERENT"
+        different += verdict != "identical"
+
+        tracemalloc.start()
+        parse_listing_page(html, 1, subtree=False)
+        tree_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del html
+        tracemalloc.start()
+        for _ in iter_listing_rows(read_chunks(path), 1):
+            pass
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"\n{path}")
+        print(f"  stream   {elapsed * 1000:6.0f} ms  {len(rows or []):4d} rows  {verdict}")
+        print(f"  peak Python memory: tree {tree_peak / 1024 / 1024:.1f} MB, "
+              f"stream {stream_peak / 1024 / 1024:.2f} MB")
+    if different:
+        sys.exit(f"\n❌ {different} page(s) differ from the tree parse")
+
+
+if __name__ == "__main__":
+    main()
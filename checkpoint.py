@@ -0,0 +1,141 @@
+"""
+Resumable crawl checkpoints.
+
+As each page finishes, its rows are appended (flushed + fsync'd) to a partial CSV
+and then a line is added to a JSONL journal recording the (query, page) unit and
+the partial file's committed size. On restart:
+  - pages already in the journal are skipped (no refetch), their rows re-read
+    from the partial CSV
+  - rows written after the last journal line (a crash mid-commit) are truncated
+  - jobs marked done are skipped entirely
+"""
+
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from html_cache import canonical_url
+
+CHECKPOINT_DIR = Path(__file__).resolve().parent / "checkpoints"
+
+
+class CrawlJournal:
+    """
+    Append-only journal of completed crawl units for one run
+    """
+
+    def __init__(self, name: str, root: Path = CHECKPOINT_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path = self.root / f"{name}.jsonl"
+        self.pages: Dict[tuple, Dict] = {}
+        self.jobs_done = set()
+        self.committed: Dict[str, int] = {}
+        self._recovered = set()
+        if self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        valid_end = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated line")
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn last line from a crash
+                valid_end += len(line)
+                if entry["type"] == "page":
+                    self.pages[(entry["query"], entry["page"])] = entry
+                    self.committed[entry["file"]] = entry["end"]
+                elif entry["type"] == "job":
+                    self.jobs_done.add(entry["label"])
+        if self.path.stat().st_size > valid_end:
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_end)
+
+    def _append(self, entry: Dict) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def partial_path(self, label: str) -> Path:
+        return self.root / f"{label}.partial.csv"
+
+    def _recover(self, partial: Path) -> None:
+        # Drop rows that were written but never committed to the journal
+        if partial.name in self._recovered:
+            return
+        self._recovered.add(partial.name)
+        committed = self.committed.get(partial.name, 0)
+        if partial.exists() and partial.stat().st_size > committed:
+            with open(partial, "r+b") as f:
+                f.truncate(committed)
+
+    # ----- pages -----
+    def page_entry(self, url: str) -> Optional[Dict]:
+        """
+        Journal entry for this results-page URL if it was already completed
+        """
+        return self.pages.get(canonical_url(url))
+
+    def record_page(self, url: str, rows: List[Dict], partial: Path, last: bool = False) -> None:
+        """
+        Durably append the page's rows, then commit the unit to the journal
+        """
+        self._recover(partial)
+        if rows:
+            new_file = not partial.exists() or partial.stat().st_size == 0
+            with open(partial, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()), extrasaction="ignore")
+                if new_file:
+                    writer.writeheader()
+                writer.writerows(rows)
+                f.flush()
+                os.fsync(f.fileno())
+        end = partial.stat().st_size if partial.exists() else 0
+        query, page_num = canonical_url(url)
+        entry = {"type": "page", "query": query, "page": page_num, "rows": len(rows),
+                 "file": partial.name, "end": end, "last": last}
+        self._append(entry)
+        self.pages[(query, page_num)] = entry
+        self.committed[partial.name] = end
+
+    def load_rows(self, partial: Path) -> List[Dict]:
+        """
+        All committed rows in a partial CSV
+        """
+        self._recover(partial)
+        if not partial.exists():
+            return []
+        with open(partial, "r", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            if "Page" in row:
+                row["Page"] = int(row["Page"])
+        return rows
+
+    # ----- jobs -----
+    def job_done(self, label: str) -> bool:
+        return label in self.jobs_done
+
+    def record_job(self, label: str) -> None:
+        """
+        Mark a job finished and drop its partial CSV
+        """
+        self._append({"type": "job", "label": label})
+        self.jobs_done.add(label)
+        self.partial_path(label).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """
+        Forget this run (journal and partial files)
+        """
+        for name in set(self.committed):
+            (self.root / name).unlink(missing_ok=True)
+        self.path.unlink(missing_ok=True)
+        self.pages, self.jobs_done, self.committed, self._recovered = {}, set(), {}, set()
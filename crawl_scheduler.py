@@ -0,0 +1,318 @@
+"""
+Run many eBay searches in one go: a job spec (queries x URL param sets) is fanned
+out to a pool of browser-context workers that share one request-rate budget per host.
+
+Job spec (JSON):
+  {
+    "queries": ["iPhone 15 Pro Max", "Pixel 9 Pro"],
+    "param_sets": {"sold": ["LH_Sold=1", "LH_Complete=1", "_ipg=240"]},  # optional
+    "max_pages": 5,                                                      # optional
+    "out_dir": "crawl_output"                                            # optional
+  }
+Each (query, param set) pair becomes one job, saved as "<out_dir>/<query>.csv"
+(or "<query> - <param set>.csv" when there are several param sets).
+
+Usage:
+  python crawl_scheduler.py catalog_jobs.json --workers 4 --rate 0.5 --burst 3
+  python crawl_scheduler.py catalog_jobs.json --incremental   # daily refresh
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import pandas as pd
+from playwright.async_api import async_playwright
+
+from async_scraper import fetch_page, parse_page
+from browser_pool import open_pool
+from browser_profile import pool_size_for_budget
+from checkpoint import CrawlJournal
+from html_cache import HtmlCache
+from incremental import HighWaterMarks, filter_new, newest_first
+from pagination import plan_pages
+from resource_policy import ResourcePolicy
+from scrape_with_playwright import BASE_URL, DEFAULT_PARAMS, build_search_url
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` requests per second on average, bursts up to `burst`.
+    Exposes the same acquire() as async_scraper.PolitenessLimiter.
+    """
+
+    def __init__(self, rate: float = 0.5, burst: int = 3):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - started
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """
+    One TokenBucket per host, created on first use, shared by every worker
+    """
+
+    def __init__(self, rate: float = 0.5, burst: int = 3):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def for_url(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._buckets[host]
+
+
+class JobIncomplete(RuntimeError):
+    """
+    Some of a job's pages could not be fetched or parsed; .rows holds what was collected
+    """
+
+    def __init__(self, message: str, rows: List[Dict]):
+        super().__init__(message)
+        self.rows = rows
+
+
+def load_jobs(spec_path: Path) -> List[Dict]:
+    """
+    Expand a job spec file into a list of {query, params, label, max_pages, out} jobs
+    """
+    spec = json.loads(Path(spec_path).read_text(encoding="utf-8"))
+    param_sets = spec.get("param_sets") or {"default": DEFAULT_PARAMS}
+    max_pages = spec.get("max_pages", 3)
+    out_dir = Path(spec.get("out_dir", "crawl_output"))
+
+    jobs = []
+    for query in spec["queries"]:
+        for set_name, params in param_sets.items():
+            label = query if len(param_sets) == 1 else f"{query} - {set_name}"
+            jobs.append({
+                "query": query,
+                "params": params,
+                "label": label,
+                "max_pages": max_pages,
+                "out": out_dir / f"{label}.csv",
+            })
+    return jobs
+
+
+async def run_job(context, job: Dict, limiter: HostRateLimiter,
+                  policy: Optional[ResourcePolicy] = None, cache: Optional[HtmlCache] = None,
+                  marks: Optional[HighWaterMarks] = None, journal: Optional[CrawlJournal] = None,
+                  executor: Optional[ProcessPoolExecutor] = None) -> List[Dict]:
+    """
+    Crawl one query page by page on a worker's context until the last page.
+    With high-water marks, only rows newer than the query's mark are returned
+    and paging stops once the mark is reached.
+    With a journal, each finished page is checkpointed and pages completed by
+    an earlier, interrupted run are skipped.
+    Parsing runs in `executor` (a process pool) when given, so it never holds
+    up the browser side.
+    Outside incremental runs, page 1's result count plans the remaining pages
+    (see pagination.py) and they are fetched concurrently; incremental runs stay
+    serial so they can stop at the mark.
+    Raises JobIncomplete when a page fails. The high-water mark then stays where
+    it was, and with a journal the job is not marked done, so a rerun fetches the
+    missing pages. The mark only moves once the crawl reached it or ran out of
+    results (or on the first run, when there is no mark yet).
+    """
+    bucket = limiter.for_url(BASE_URL)
+    params = newest_first(job["params"]) if marks is not None else job["params"]
+    first_url = build_search_url(1, job["query"], params)
+    mark = marks.get(first_url) if marks is not None else None
+    partial = journal.partial_path(job["label"]) if journal is not None else None
+    rows = journal.load_rows(partial) if journal is not None else []
+
+    async def fetch_and_parse(page_num: int):
+        html = await fetch_page(context, page_num, bucket, job["query"], params, policy, cache)
+        if html is None:
+            return None, None, False
+        if executor is not None:
+            page_rows, has_next = await asyncio.get_running_loop().run_in_executor(
+                executor, parse_page, html, page_num)
+        else:
+            page_rows, has_next = await asyncio.to_thread(parse_page, html, page_num)
+        return html, page_rows, has_next
+
+    async def planned_page(page_num: int, planned: int) -> Optional[List[Dict]]:
+        url = build_search_url(page_num, job["query"], params)
+        if journal is not None and journal.page_entry(url) is not None:
+            return []  # rows already loaded from the partial CSV
+        _, page_rows, has_next = await fetch_and_parse(page_num)
+        if page_rows is None:
+            print(f"   ⚠️ {job['label']}: planned page {page_num} failed")
+            return None
+        if journal is not None:
+            journal.record_page(url, page_rows, partial, last=page_num == planned or not has_next)
+        return page_rows
+
+    complete = False  # reached the mark or the last page of results
+    for page_num in range(1, job["max_pages"] + 1):
+        url = build_search_url(page_num, job["query"], params)
+        entry = journal.page_entry(url) if journal is not None else None
+        if entry is not None:
+            if entry["last"]:
+                complete = True
+                break
+            continue
+        html, page_rows, has_next = await fetch_and_parse(page_num)
+        if page_rows is None:
+            raise JobIncomplete(f"page {page_num} failed", rows)
+        page_rows, reached_mark = filter_new(page_rows, mark)
+        rows.extend(page_rows)
+        planned = plan_pages(html, params, job["max_pages"]) if page_num == 1 and marks is None else None
+        if journal is not None:
+            journal.record_page(url, page_rows, partial,
+                                last=reached_mark or not has_next or planned == page_num)
+        if reached_mark:
+            print(f"   ✓ {job['label']}: reached high-water mark on page {page_num}")
+            complete = True
+            break
+        if not has_next:
+            complete = True
+            break
+        if planned is not None:
+            print(f"   ✓ {job['label']}: {planned} page(s) planned")
+            pages = range(2, planned + 1)
+            results = await asyncio.gather(*(planned_page(n, planned) for n in pages))
+            for page_rows in results:
+                rows.extend(page_rows or [])
+            failed = [n for n, page_rows in zip(pages, results) if page_rows is None]
+            if failed:
+                raise JobIncomplete(f"planned page(s) {', '.join(map(str, failed))} failed", rows)
+            break
+    if marks is not None and (complete or mark is None):
+        marks.update(first_url, rows)
+    return rows
+
+
+async def run_jobs(jobs: List[Dict], workers: int = 4, rate: float = 0.5, burst: int = 3,
+                   headless: bool = True, incremental: bool = False,
+                   journal: Optional[CrawlJournal] = None) -> Dict[str, int]:
+    """
+    Fan jobs out to `workers` pooled browser contexts and write one CSV per job.
+    Uses the running browser_pool.py service if there is one.
+    Incremental runs only fetch rows newer than each query's high-water mark
+    and merge them into the existing CSV.
+    With a journal, an interrupted run picks up where it stopped; the journal
+    is cleared once every job has finished.
+    Returns {label: new rows}.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    limiter = HostRateLimiter(rate, burst)
+    policy = ResourcePolicy.load()
+    # Incremental runs must see today's page 1, so never serve cached copies
+    cache = HtmlCache(ttl=0) if incremental else HtmlCache()
+    marks = HighWaterMarks() if incremental else None
+    summary: Dict[str, int] = {}
+
+    async with async_playwright() as p:
+        async with open_pool(p, size=workers, headless=headless) as pool, ProcessPoolExecutor() as executor:
+
+            async def worker(worker_id: int) -> None:
+                while True:
+                    try:
+                        job = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    if journal is not None and journal.job_done(job["label"]):
+                        print(f"[worker {worker_id}] ⏭ {job['label']} (done in an earlier run)")
+                        continue
+                    print(f"[worker {worker_id}] ▶ {job['label']}")
+                    failed = False
+                    async with pool.lease() as context:
+                        try:
+                            rows = await run_job(context, job, limiter, policy, cache, marks, journal, executor)
+                        except JobIncomplete as e:
+                            print(f"[worker {worker_id}] ❌ {job['label']}: {e} - rerun to fetch the rest")
+                            rows, failed = e.rows, True
+                        except Exception as e:
+                            print(f"[worker {worker_id}] ❌ {job['label']}: {e}")
+                            rows, failed = [], True
+                    if rows:
+                        job["out"].parent.mkdir(parents=True, exist_ok=True)
+                        df = pd.DataFrame(rows)
+                        if incremental and job["out"].exists():
+                            df = pd.concat([df, pd.read_csv(job["out"])]).drop_duplicates(subset="Link")
+                        df.to_csv(job["out"], index=False)
+                    if marks is not None:
+                        marks.save()
+                    if journal is not None and not failed:
+                        journal.record_job(job["label"])
+                    summary[job["label"]] = len(rows)
+                    print(f"[worker {worker_id}] ✓ {job['label']}: {len(rows)} items")
+
+            await asyncio.gather(*(worker(i) for i in range(1, workers + 1)))
+
+    cache.close()
+    if journal is not None and all(journal.job_done(job["label"]) for job in jobs):
+        journal.clear()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a batch of eBay searches in parallel.")
+    parser.add_argument("spec", type=str, help="Path to the JSON job spec")
+    parser.add_argument("--workers", type=int, default=4, help="Browser contexts in the pool (default: 4)")
+    parser.add_argument("--memory-budget", type=float, default=0,
+                        help="Size the pool to this many MB instead of --workers (see browser_profile.py)")
+    parser.add_argument("--rate", type=float, default=0.5,
+                        help="Average requests/second allowed per host (default: 0.5)")
+    parser.add_argument("--burst", type=int, default=3, help="Token bucket burst size (default: 3)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser windows")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch listings newer than each query's high-water mark")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Ignore checkpoints from an interrupted run of this spec")
+    args = parser.parse_args()
+
+    jobs = load_jobs(Path(args.spec))
+    print(f"Loaded {len(jobs)} jobs from {args.spec}")
+    journal = CrawlJournal(Path(args.spec).stem)
+    if args.fresh:
+        journal.clear()
+    elif journal.pages or journal.jobs_done:
+        print(f"Resuming: {len(journal.pages)} pages / {len(journal.jobs_done)} jobs already done")
+
+    workers = args.workers
+    if args.memory_budget:
+        workers = pool_size_for_budget(args.memory_budget)
+        print(f"Memory budget {args.memory_budget:.0f} MB -> {workers} workers")
+
+    start = time.perf_counter()
+    summary = asyncio.run(run_jobs(jobs, workers, args.rate, args.burst,
+                                  headless=not args.headed, incremental=args.incremental,
+                                  journal=journal))
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'='*60}")
+    print(f"✅ {len(summary)} jobs, {sum(summary.values())} items in {elapsed:.1f}s")
+    print(f"{'='*60}")
+    for label, count in summary.items():
+        print(f"  {label}: {count} items")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Extract listings from the structured data eBay embeds in search pages, instead of
+walking 240 DOM cards with CSS selectors.
+
+Search pages carry two blobs we can use:
+  - "listings": [{"itemId": ..., "rank": ...}, ...] in the main search context:
+    exactly the ids of the main results, in page order
+  - Marko component state ($M_..._C = (...).concat({...})) with one model per card
+    holding listingId, imgAlt (the title) and imgSrc (the image URL)
+
+The blobs have no price or sold date, so those two fields come from a byte-level
+scan of each card's markup (located by its data-listingid attribute) - still no
+tree is built. The image is taken from that markup too (the card's first <img
+src>, as the DOM parser reads it): imgSrc is always the CDN URL, while a page
+saved from the browser has its src attributes rewritten to local ./..._files/
+paths. imgSrc is only used when the card's markup isn't found. When the blobs
+are missing, we fall back to the DOM parser.
+
+Usage:
+  python embedded_json.py playwright_rendered.html ebay_iphone.html   # parity + timing vs DOM
+"""
+
+import html as html_lib
+import json
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from parser_backends import has_next_link, parse_listing_page
+from scrape_with_playwright import extract_page_items
+
+ITEM_URL = "https://www.ebay.com/itm/{}"
+
+LISTINGS_RE = re.compile(r'"listings":\[')
+MARKO_STATE_RE = re.compile(r'\$M_\w+_C=\(window\.\$M_\w+_C\|\|\[\]\)\.concat\(')
+CARD_START_RE = re.compile(r'data-listingid="(\d+)"')
+PRICE_RE = re.compile(r'class="[^"]*\bs-card__price\b[^"]*">([^<]*)<')
+SOLD_RE = re.compile(r'>\s*(Sold\s[^<]*)<')
+IMG_RE = re.compile(r'<img\b[^>]*>')
+SRC_RE = re.compile(r'\ssrc="([^"]*)"')
+
+_decoder = json.JSONDecoder()
+
+
+def find_result_ids(html: str) -> Optional[List[str]]:
+    """
+    Main-results item ids in page order, or None if the blob is missing
+    """
+    m = LISTINGS_RE.search(html)
+    if not m:
+        return None
+    try:
+        listings, _ = _decoder.raw_decode(html, m.end() - 1)
+    except ValueError:
+        return None
+    return [str(entry["itemId"]) for entry in listings if "itemId" in entry]
+
+
+def find_listing_models(html: str) -> Dict[str, Dict]:
+    """
+    {listingId: model} for every card model in the component state blobs
+    """
+    models: Dict[str, Dict] = {}
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "listingId" in node and "imgAlt" in node:
+                models.setdefault(str(node["listingId"]), node)
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    for m in MARKO_STATE_RE.finditer(html):
+        try:
+            state, _ = _decoder.raw_decode(html, m.end())
+        except ValueError:
+            continue
+        walk(state)
+    return models
+
+
+def card_details(html: str) -> Dict[str, Tuple[str, str, str]]:
+    """
+    {listingId: (price, sold date, image)} scanned from each card's own markup
+    """
+    starts = [(m.start(), m.group(1)) for m in CARD_START_RE.finditer(html)]
+    details = {}
+    for i, (pos, listing_id) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(html)
+        chunk = html[pos:end]
+        price = PRICE_RE.search(chunk)
+        sold = SOLD_RE.search(chunk)
+        img = IMG_RE.search(chunk)
+        src = SRC_RE.search(img.group(0)) if img else None
+        details.setdefault(listing_id, (
+            html_lib.unescape(price.group(1)).strip() if price else 'N/A',
+            html_lib.unescape(sold.group(1)).strip() if sold else 'N/A',
+            html_lib.unescape(src.group(1)) if src else 'N/A',
+        ))
+    return details
+
+
+def extract_embedded(html: str, page_num: int) -> Optional[List[Dict]]:
+    """
+    Rows from the embedded blobs, or None if the page doesn't carry them
+    """
+    ids = find_result_ids(html)
+    if not ids:
+        return None
+    models = find_listing_models(html)
+    if not models:
+        return None
+    details = card_details(html)
+
+    rows = []
+    for listing_id in ids:
+        model = models.get(listing_id)
+        if model is None:
+            continue
+        title = (model.get("imgAlt") or "").strip()
+        if len(title) < 10:
+            continue
+        price, sold, image = details.get(listing_id, ('N/A', 'N/A', model.get("imgSrc") or 'N/A'))
+        rows.append({
+            'Page': page_num,
+            'Title': title,
+            'Price': price,
+            'Sold Date': sold,
+            'Link': ITEM_URL.format(listing_id),
+            'Image Link': image,
+        })
+    return rows
+
+
+def parse_listings(html: str, page_num: int, backend: Optional[str] = None) -> Tuple[Optional[List[Dict]], bool]:
+    """
+    (rows, has_next) from the embedded blobs, falling back to the DOM parser
+    (backend: see parser_backends.py)
+    """
+    rows = extract_embedded(html, page_num)
+    if rows:
+        return rows, has_next_link(html)
+    return parse_listing_page(html, page_num, backend)
+
+
+def main():
+    paths = sys.argv[1:] or ["playwright_rendered.html"]
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        start = time.perf_counter()
+        json_rows = extract_embedded(html, 1)
+        json_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dom_rows = extract_page_items(BeautifulSoup(html, 'html.parser'), 1)
+        dom_time = time.perf_counter() - start
+
+        print(f"\n{path}")
+        if json_rows is None:
+            print("  ❌ No embedded listing data found")
+            continue
+        print(f"  embedded JSON: {len(json_rows):4d} rows in {json_time * 1000:7.1f} ms")
+        print(f"  DOM parser:    {len(dom_rows or []):4d} rows in {dom_time * 1000:7.1f} ms")
+        dom_by_link = {r['Link']: r for r in dom_rows or []}
+        for field in ('Title', 'Price', 'Sold Date', 'Image Link'):
+            diffs = sum(1 for r in json_rows if r['Link'] in dom_by_link and dom_by_link[r['Link']][field] != r[field])
+            print(f"  {field:<11} differs on {diffs} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Bounded, sampled capture of failure artifacts (page HTML, screenshots).
+
+capture() decides up front whether a failure is worth keeping:
+  - the first `burst` failures of each cause per `window` seconds are kept,
+    after that only a `sample_rate` fraction
+  - if the writer is behind (queue full), the artifact is dropped
+HTML/screenshot arguments may be callables (e.g. page.content), which are only
+invoked for admitted failures - but then on the caller's thread: in the browser
+crawls each admitted failure costs a page.content() and a JPEG screenshot on the
+crawl thread. The burst limit and sampling bound how often that happens;
+compressing and writing the files is left to the background thread.
+
+Admitted artifacts are gzipped and written by a background thread into a ring
+directory (failure_artifacts/ by default) with an index.sqlite of cause, URL,
+timestamp, files and size. Once the directory passes max_bytes the oldest
+artifacts are deleted.
+
+Usage:
+  python failure_artifacts.py list
+  python failure_artifacts.py show 42 > page.html
+  python failure_artifacts.py clear
+"""
+
+import argparse
+import gzip
+import json
+import queue
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Union
+
+ARTIFACT_DIR = Path(__file__).resolve().parent / "failure_artifacts"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+Payload = Union[None, str, bytes, Callable[[], Union[str, bytes]]]
+
+
+class ArtifactStore:
+    """
+    capture(cause, url, html=..., screenshot=...) from any thread; close() to drain
+    """
+
+    def __init__(self, root: Path = ARTIFACT_DIR, max_bytes: int = DEFAULT_MAX_BYTES, burst: int = 3,
+                 window: float = 60.0, sample_rate: float = 0.05, queue_size: int = 16):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.burst = burst
+        self.window = window
+        self.sample_rate = sample_rate
+        self.stats = {"captured": 0, "sampled_out": 0, "dropped": 0}
+        self._recent: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        db = self._connect()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL, cause TEXT, url TEXT, files TEXT, "
+            "bytes INTEGER, extra TEXT)"
+        )
+        db.commit()
+        db.close()
+        self._writer = threading.Thread(target=self._run, name="failure-artifacts", daemon=True)
+        self._writer.start()
+
+    # ----- admission -----
+    def admit(self, cause: str) -> bool:
+        """
+        Whether a failure with this cause should be captured right now
+        """
+        now = time.monotonic()
+        with self._lock:
+            recent = [t for t in self._recent.get(cause, []) if now - t < self.window]
+            if len(recent) < self.burst or random.random() < self.sample_rate:
+                recent.append(now)
+                self._recent[cause] = recent
+                return True
+            self._recent[cause] = recent
+            self.stats["sampled_out"] += 1
+            return False
+
+    def capture(self, cause: str, url: str, html: Payload = None, screenshot: Payload = None,
+                **extra) -> bool:
+        """
+        Queue an artifact for writing; False if it was sampled out or dropped.
+        Callable html/screenshot arguments run here, on the caller's thread.
+        """
+        if not self.admit(cause):
+            return False
+        try:
+            item = {
+                "cause": cause,
+                "url": url,
+                "ts": time.time(),
+                "html": html() if callable(html) else html,
+                "screenshot": screenshot() if callable(screenshot) else screenshot,
+                "extra": extra,
+            }
+        except Exception as e:
+            print(f"⚠️ Could not collect failure artifact for {cause}: {e}")
+            return False
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += 1
+            return False
+        with self._lock:
+            self.stats["captured"] += 1
+        return True
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.root / "index.sqlite"))
+
+    # ----- writer thread -----
+    def _run(self) -> None:
+        db = self._connect()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(db, item)
+            except Exception as e:
+                print(f"⚠️ Failed to write failure artifact: {e}")
+        db.close()
+
+    def _write(self, db: sqlite3.Connection, item: Dict) -> None:
+        cur = db.execute(
+            "INSERT INTO artifacts (ts, cause, url, files, bytes, extra) VALUES (?, ?, ?, '[]', 0, ?)",
+            (item["ts"], item["cause"], item["url"], json.dumps(item["extra"])),
+        )
+        seq = cur.lastrowid
+        stem = f"{seq:06d}-{re.sub(r'[^A-Za-z0-9_.-]+', '_', item['cause'])}"
+        files, size = [], 0
+        if item["html"] is not None:
+            html = item["html"]
+            data = gzip.compress(html.encode("utf-8") if isinstance(html, str) else html, compresslevel=6)
+            files.append(f"{stem}.html.gz")
+            (self.root / files[-1]).write_bytes(data)
+            size += len(data)
+        if item["screenshot"] is not None:
+            shot = item["screenshot"]
+            ext = "jpg" if shot[:2] == b"\xff\xd8" else "png"
+            files.append(f"{stem}.{ext}")
+            (self.root / files[-1]).write_bytes(shot)
+            size += len(shot)
+        db.execute("UPDATE artifacts SET files = ?, bytes = ? WHERE seq = ?", (json.dumps(files), size, seq))
+        self._enforce_cap(db)
+        db.commit()
+
+    def _enforce_cap(self, db: sqlite3.Connection) -> None:
+        total = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM artifacts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for seq, files, size in db.execute("SELECT seq, files, bytes FROM artifacts ORDER BY seq").fetchall():
+            if total <= self.max_bytes:
+                break
+            for name in json.loads(files):
+                (self.root / name).unlink(missing_ok=True)
+            db.execute("DELETE FROM artifacts WHERE seq = ?", (seq,))
+            total -= size
+
+    # ----- reading -----
+    def entries(self) -> Iterator[Dict]:
+        db = self._connect()
+        try:
+            for seq, ts, cause, url, files, size in db.execute(
+                "SELECT seq, ts, cause, url, files, bytes FROM artifacts ORDER BY seq"
+            ):
+                yield {"seq": seq, "ts": ts, "cause": cause, "url": url, "files": json.loads(files), "bytes": size}
+        finally:
+            db.close()
+
+    def report(self) -> str:
+        s = self.stats
+        return (f"🧾 Failure artifacts: {s['captured']} captured, {s['sampled_out']} sampled out, "
+                f"{s['dropped']} dropped (writer busy) -> {self.root.name}/")
+
+    def close(self) -> None:
+        """
+        Finish writing everything queued
+        """
+        self._queue.put(None)
+        self._writer.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect captured failure artifacts.")
+    parser.add_argument("command", choices=["list", "show", "clear"])
+    parser.add_argument("seq", nargs="?", type=int, help="show: artifact number (prints its HTML)")
+    args = parser.parse_args()
+
+    store = ArtifactStore()
+    if args.command == "list":
+        total = 0
+        for entry in store.entries():
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["ts"]))
+            print(f"  #{entry['seq']:<5} {stamp}  {entry['cause']:<20} {entry['bytes'] / 1024:7.0f} KB  {entry['url']}")
+            total += entry["bytes"]
+        print(f"Total: {total / 1024 / 1024:.1f} MB")
+    elif args.command == "show":
+        entry = next((e for e in store.entries() if e["seq"] == args.seq), None)
+        html_file = next((f for f in entry["files"] if f.endswith(".html.gz")), None) if entry else None
+        if html_file is None:
+            print(f"❌ No HTML for artifact #{args.seq}", file=sys.stderr)
+        else:
+            sys.stdout.write(gzip.decompress((store.root / html_file).read_bytes()).decode("utf-8"))
+    elif args.command == "clear":
+        for entry in store.entries():
+            for name in entry["files"]:
+                (store.root / name).unlink(missing_ok=True)
+        db = store._connect()
+        db.execute("DELETE FROM artifacts")
+        db.commit()
+        db.close()
+        print("✓ Cleared failure artifacts")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,62 @@
 """
 Final working eBay scraper using the playwright_rendered.html file
+
+Usage:
+  python final_scraper.py
+  python final_scraper.py --file ebay_iphone.html --parser selectolax
+  python final_scraper.py --file ebay_iphone.html --stream
 """
-from bs4 import BeautifulSoup
+import argparse
+
 import pandas as pd
 
-def parse_ebay_html(filename='playwright_rendered.html'):
+from card_stream import CardStream, iter_cards, read_chunks
+from parser_backends import BACKENDS, DEFAULT_BACKEND, get_backend, parse_results, saved_page_rows
+
+def parse_ebay_html(filename='playwright_rendered.html', parser=None, subtree=True, stream=False):
+    """
+    parser: HTML parser backend - html.parser, lxml or selectolax (default: html.parser)
+    subtree: Parse only the ul.srp-results fragment instead of the whole page (default: True)
+    stream: Read the file in chunks and parse card by card with card_stream.CardStream,
+            never holding the page or a tree (default: False; parser/subtree are ignored)
+    """
+    if stream:
+        card_stream = CardStream()
+        items_data = saved_page_rows(iter_cards(read_chunks(filename), card_stream))
+        if not card_stream.found_list:
+            print("No results list found!")
+            return []
+        print(f"Found {card_stream.card_count} total items")
+        return items_data
+    
     with open(filename, 'r', encoding='utf-8') as f:
         html = f.read()
     
-    soup = BeautifulSoup(html, 'html.parser')
+    backend = get_backend(parser)
     
     # Find the results list
-    results = soup.find('ul', {'class': 'srp-results'})
-    if not results:
+    cards = backend.cards(parse_results(backend, html) if subtree else backend.parse(html))
+    if cards is None:
         print("No results list found!")
         return []
     
-    items = results.find_all('li')
-    print(f"Found {len(items)} total items")
-    
-    items_data = []
-    for idx, item in enumerate(items, 1):
-        try:
-            # Extract title from heading
-            title_elem = item.find('div', {'role': 'heading'})
-            if not title_elem:
-                continue
-            title = title_elem.get_text(strip=True).replace('Opens in a new window or tab', '').strip()
-            
-            # Extract price
-            price_elem = item.find('span', class_='s-card__price')
-            price = price_elem.get_text(strip=True) if price_elem else 'N/A'
-            
-            # Extract link
-            link_elem = item.find('a', href=lambda x: x and '/itm/' in x if x else False)
-            if not link_elem:
-                continue
-            link = link_elem.get('href', '').split('?')[0]
-            
-            # Extract image
-            img_elem = item.find('img')
-            image_url = img_elem.get('src', 'N/A') if img_elem else 'N/A'
-            
-            items_data.append({
-                'Title': title,
-                'Price': price,
-                'Link': link,
-                'Image Link': image_url
-            })
-            
-        except Exception as e:
-            print(f"Error parsing item {idx}: {e}")
-            continue
+    print(f"Found {len(cards)} total items")
     
-    return items_data
+    # Title from the heading, price, /itm/ link and image of each card
+    return saved_page_rows(cards)
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Parse a saved eBay results page into CSV.")
+    arg_parser.add_argument("--file", "-f", default='playwright_rendered.html',
+                            help="Saved results page (default: playwright_rendered.html)")
+    arg_parser.add_argument("--parser", "-p", choices=list(BACKENDS), default=DEFAULT_BACKEND,
+                            help=f"HTML parser backend (default: {DEFAULT_BACKEND})")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="Parse card by card while reading the file (low memory)")
+    args = arg_parser.parse_args()
+
     print("Parsing eBay HTML...\n")
-    items = parse_ebay_html()
+    items = parse_ebay_html(args.file, args.parser, stream=args.stream)
     
     if items:
         print(f"\n✓ Successfully parsed {len(items)} items")
@@ -0,0 +1,187 @@
+"""
+Content-addressed, compressed on-disk cache of raw search-results HTML.
+
+Layout (under html_cache/):
+  objects/ab/abcdef...html.gz   gzip'd page, named by sha256 of the HTML
+  index.sqlite                  (canonical query URL, page) -> digest, fetch/access times
+
+Identical pages share one blob. Entries older than the TTL are ignored by get(),
+and evict() drops least-recently-used entries until the cache fits its size budget.
+
+Usage:
+  python html_cache.py list
+  python html_cache.py export --out cached_results.csv    # re-run the parser, no refetch
+  python html_cache.py evict --max-mb 200
+"""
+
+import argparse
+import gzip
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+CACHE_DIR = Path(__file__).resolve().parent / "html_cache"
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+
+def canonical_url(url: str) -> Tuple[str, int]:
+    """
+    Split a search URL into (canonical URL without _pgn, page number).
+    Query params are sorted and the host lowercased so equivalent URLs match.
+    """
+    parts = urlsplit(url)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    page_num = 1
+    kept = []
+    for key, value in params:
+        if key == "_pgn":
+            page_num = int(value) if value.isdigit() else 1
+        else:
+            kept.append((key, value))
+    # "+" stays encoded (%2B) so it never reads as a space
+    query = urlencode(sorted(kept), safe="|")
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, "")), page_num
+
+
+class HtmlCache:
+    """
+    get(url) / put(url, html) against the on-disk cache
+    """
+
+    def __init__(self, root: Path = CACHE_DIR, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.root / "index.sqlite"))
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (url, page)
+            )
+        """)
+        self.db.commit()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.html.gz"
+
+    def put(self, url: str, html: str) -> str:
+        """
+        Store a page and return its digest
+        """
+        key, page_num = canonical_url(url)
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(gzip.compress(data, compresslevel=6))
+            tmp.replace(path)
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO pages (url, page, digest, size, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, page_num, digest, path.stat().st_size, now, now),
+        )
+        self.db.commit()
+        if self.total_bytes() > self.max_bytes:
+            self.evict()
+        return digest
+
+    def get(self, url: str, max_age: Optional[float] = None) -> Optional[str]:
+        """
+        Cached HTML for this URL, or None if missing or older than the TTL
+        """
+        key, page_num = canonical_url(url)
+        row = self.db.execute(
+            "SELECT digest, fetched_at FROM pages WHERE url = ? AND page = ?", (key, page_num)
+        ).fetchone()
+        if row is None:
+            return None
+        digest, fetched_at = row
+        max_age = self.ttl if max_age is None else max_age
+        path = self._blob_path(digest)
+        if time.time() - fetched_at > max_age or not path.exists():
+            return None
+        self.db.execute("UPDATE pages SET accessed_at = ? WHERE url = ? AND page = ?", (time.time(), key, page_num))
+        self.db.commit()
+        return gzip.decompress(path.read_bytes()).decode("utf-8")
+
+    def entries(self) -> Iterator[Dict]:
+        for url, page_num, digest, size, fetched_at in self.db.execute(
+            "SELECT url, page, digest, size, fetched_at FROM pages ORDER BY url, page"
+        ):
+            yield {"url": url, "page": page_num, "digest": digest, "size": size, "fetched_at": fetched_at}
+
+    def read(self, digest: str) -> str:
+        return gzip.decompress(self._blob_path(digest).read_bytes()).decode("utf-8")
+
+    def total_bytes(self) -> int:
+        row = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM pages)").fetchone()
+        return row[0]
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Drop least-recently-used entries until the cache fits max_bytes.
+        Returns the number of entries removed.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        rows = self.db.execute("SELECT url, page, digest FROM pages ORDER BY accessed_at").fetchall()
+        for url, page_num, digest in rows:
+            if self.total_bytes() <= max_bytes:
+                break
+            self.db.execute("DELETE FROM pages WHERE url = ? AND page = ?", (url, page_num))
+            removed += 1
+            still_used = self.db.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if not still_used:
+                self._blob_path(digest).unlink(missing_ok=True)
+        self.db.commit()
+        return removed
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or re-parse the results-page cache.")
+    parser.add_argument("command", choices=["list", "export", "evict"])
+    parser.add_argument("--out", "-o", type=str, default="cached_results.csv", help="CSV for export")
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024, help="Size budget for evict")
+    args = parser.parse_args()
+
+    cache = HtmlCache()
+    if args.command == "list":
+        for entry in cache.entries():
+            age_h = (time.time() - entry["fetched_at"]) / 3600
+            print(f"  p{entry['page']:<3} {entry['size'] / 1024:7.0f} KB  {age_h:5.1f}h  {entry['url']}")
+        print(f"Total: {cache.total_bytes() / 1024 / 1024:.1f} MB")
+    elif args.command == "export":
+        import pandas as pd
+
+        from async_scraper import parse_page
+
+        rows = []
+        for entry in cache.entries():
+            page_rows, _ = parse_page(cache.read(entry["digest"]), entry["page"])
+            for row in page_rows or []:
+                rows.append({**row, "Query URL": entry["url"]})
+        pd.DataFrame(rows).to_csv(args.out, index=False)
+        print(f"✓ Re-parsed {len(rows)} items from cache -> {args.out}")
+    elif args.command == "evict":
+        removed = cache.evict(int(args.max_mb * 1024 * 1024))
+        print(f"✓ Evicted {removed} entries, {cache.total_bytes() / 1024 / 1024:.1f} MB left")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Incremental sold-listing crawls with a per-query high-water mark.
+
+Sold searches sorted by end date (_sop=13) come back newest-first, so once we
+know the newest item ID and sold date seen for a query, paging can stop as soon
+as a page reaches that mark (every later page is entirely older). Marks live in
+high_water_marks.json, keyed by the canonical query URL (see html_cache.canonical_url).
+"""
+
+import json
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from html_cache import canonical_url
+
+MARKS_FILE = Path(__file__).resolve().parent / "high_water_marks.json"
+
+# "Ended recently" sort; the default Best Match order is not date-ordered
+NEWEST_FIRST_PARAM = "_sop=13"
+
+ITEM_ID_RE = re.compile(r'/itm/(?:[^/?]+/)?(\d+)')
+
+
+def item_id(link: str) -> Optional[str]:
+    """
+    'https://www.ebay.com/itm/255803826545' -> '255803826545'
+    """
+    m = ITEM_ID_RE.search(link or '')
+    return m.group(1) if m else None
+
+
+def sold_date(text: str) -> Optional[date]:
+    """
+    'Sold  Oct 29, 2025' -> date(2025, 10, 29); None if it can't be parsed
+    """
+    cleaned = re.sub(r'^\s*Sold\s+', '', text or '').strip()
+    cleaned = re.sub(r'\s{2,}', ' ', cleaned)
+    try:
+        return datetime.strptime(cleaned, '%b %d, %Y').date()
+    except ValueError:
+        return None
+
+
+def newest_first(params: List[str]) -> List[str]:
+    """
+    Force end-date sort unless the params already pick a sort order
+    """
+    if any(p.startswith("_sop=") for p in params):
+        return params
+    return [*params, NEWEST_FIRST_PARAM]
+
+
+def query_key(url: str) -> str:
+    return canonical_url(url)[0]
+
+
+def filter_new(rows: List[Dict], mark: Optional[Dict]) -> Tuple[List[Dict], bool]:
+    """
+    Split a page against the mark: (rows not older than the mark, reached_mark).
+    reached_mark is True once any row is at/behind the mark - with newest-first
+    results every later page is then entirely older, so paging can stop.
+    Rows from the mark's own day are kept (sold dates only have day precision),
+    except the mark item itself.
+    """
+    if not mark:
+        return rows, False
+    mark_date = date.fromisoformat(mark['sold_date'])
+    new_rows = []
+    for row in rows:
+        row_date = sold_date(row.get('Sold Date', ''))
+        if item_id(row.get('Link', '')) == mark['item_id']:
+            continue
+        if row_date is None or row_date >= mark_date:
+            new_rows.append(row)
+    return new_rows, len(new_rows) < len(rows)
+
+
+class HighWaterMarks:
+    """
+    {query key: {'item_id', 'sold_date', 'updated_at'}} persisted as JSON
+    """
+
+    def __init__(self, path: Path = MARKS_FILE):
+        self.path = Path(path)
+        self.marks: Dict[str, Dict] = {}
+        if self.path.exists():
+            self.marks = json.loads(self.path.read_text(encoding='utf-8'))
+
+    def get(self, url: str) -> Optional[Dict]:
+        return self.marks.get(query_key(url))
+
+    def update(self, url: str, rows: List[Dict]) -> None:
+        """
+        Move the mark to the newest dated row seen (first one wins on ties,
+        since results are newest-first)
+        """
+        newest = None
+        for row in rows:
+            row_date = sold_date(row.get('Sold Date', ''))
+            row_id = item_id(row.get('Link', ''))
+            if row_date and row_id and (newest is None or row_date > newest[0]):
+                newest = (row_date, row_id)
+        if newest is None:
+            return
+        current = self.get(url)
+        if current and date.fromisoformat(current['sold_date']) > newest[0]:
+            return
+        self.marks[query_key(url)] = {
+            'item_id': newest[1],
+            'sold_date': newest[0].isoformat(),
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def save(self) -> None:
+        self.path.write_text(json.dumps(self.marks, indent=2, sort_keys=True), encoding='utf-8')
@@ -0,0 +1,126 @@
+"""
+Layout fingerprints and cached selector plans for saved results pages.
+
+eBay has served two card templates:
+  s-card  li.s-card under ul.srp-results (div[role=heading], span.s-card__price) -
+          what final_scraper reads
+  s-item  li.s-item cards (.s-item__title, .s-item__price, ...) - what
+          scrap.parse_items was written for, with fallbacks for its variants
+
+fingerprint() reads the template from the first card, and for s-item pages which
+of the REQUIRED_MARKERS occur anywhere in the page (plain substring scans, no
+parse). Each marker is a substring every match of its node strategy or selector
+must contain, so a marker missing from the page proves that selector can't match.
+
+s-card pages go straight to the backend's card reader. For s-item pages the plan
+for a fingerprint keeps every node strategy and selector of parser_backends.s_items
+in its original priority order and only drops the ones proven absent - so a
+planned parse returns exactly what full probing returns, and the same page gives
+the same rows whatever pages a process saw before it. Selectors without a
+marker (h3, img, ...) are always kept. Plans are kept per process in PLANS.
+
+Usage:
+  python layout_plans.py playwright_rendered.html ebay_iphone.html   # fingerprint, plan and timing per file
+"""
+
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from parser_backends import (S_ITEM_FIELDS, S_ITEM_NODES, get_backend, parse_results, s_item_rows, s_items,
+                             saved_page_rows)
+
+CARD_START_RE = re.compile(r'class="(s-card|s-item)[\s"]')
+# Substring each node strategy / selector in S_ITEM_NODES / S_ITEM_FIELDS needs in the markup to match
+# (None: no such substring, never skipped)
+REQUIRED_MARKERS: Dict[str, Optional[str]] = {
+    'links': 's-item__link',
+    'wrappers': 's-item__wrapper',
+    'generic': 's-item__title',
+    ".s-item__title": 's-item__title',
+    "[data-testid='item-title']": 'item-title',
+    "h3": None,
+    "a.s-item__link": 's-item__link',
+    "a[href*='/itm/']": None,
+    ".s-item__price": 's-item__price',
+    "[data-testid='item-price']": 'item-price',
+    "img.s-item__image-img": 's-item__image-img',
+    ".s-item__image-wrapper img": 's-item__image-wrapper',
+    "img": None,
+}
+FIELD_MARKERS = tuple(dict.fromkeys(m for m in REQUIRED_MARKERS.values() if m is not None))
+
+Fingerprint = Tuple[str, ...]
+
+PLANS: Dict[Fingerprint, Dict] = {}
+stats = {"planned": 0, "new": 0, "s-card": 0}
+
+
+def fingerprint(html: str) -> Fingerprint:
+    """
+    (layout, *markers present) for the page; layout is s-card, s-item or none
+    """
+    first_card = CARD_START_RE.search(html)
+    if not first_card:
+        return ("none",)
+    if first_card.group(1) == "s-card":
+        return ("s-card",)
+    return ("s-item",) + tuple(marker for marker in FIELD_MARKERS if marker in html)
+
+
+def plan_for(key: Fingerprint) -> Dict:
+    """
+    The full chains minus the strategies / selectors whose marker the page lacks
+    """
+    present = set(key[1:])
+
+    def possible(name: str) -> bool:
+        return REQUIRED_MARKERS[name] is None or REQUIRED_MARKERS[name] in present
+
+    return {
+        "nodes": [s for s in S_ITEM_NODES if possible(s)],
+        "fields": {field: [s for s in selectors if possible(s)] for field, selectors in S_ITEM_FIELDS.items()},
+    }
+
+
+def extract_items(html: str, backend: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+    """
+    Title/Price/Link/Image Link records for a saved results page of either layout
+    """
+    parser = get_backend(backend)
+    key = fingerprint(html)
+    if key[0] == "s-card":
+        stats["s-card"] += 1
+        return saved_page_rows(parser.cards(parse_results(parser, html)))
+
+    plan = PLANS.get(key)
+    if plan is None:
+        stats["new"] += 1
+        plan = PLANS[key] = plan_for(key)
+    else:
+        stats["planned"] += 1
+    return s_item_rows(s_items(parser, parser.parse(html), plan))
+
+
+def main():
+    paths = sys.argv[1:] or ["playwright_rendered.html", "ebay_iphone.html"]
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            html = f.read()
+        key = fingerprint(html)
+        for attempt in ("first", "again"):
+            start = time.perf_counter()
+            items = extract_items(html)
+            elapsed = time.perf_counter() - start
+            print(f"  {path}  [{attempt}] {len(items):4d} items  {elapsed * 1000:6.0f} ms")
+        print(f"    fingerprint: {' '.join(key)}")
+        if key in PLANS:
+            plan = PLANS[key]
+            print(f"    plan: nodes={'|'.join(plan['nodes']) or '-'} "
+                  + " ".join(f"{field}={'|'.join(sel)}" for field, sel in plan['fields'].items()))
+    print(f"\nPages: {stats['s-card']} s-card, {stats['planned']} from a cached plan, {stats['new']} new plan(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Event-driven page readiness and an adaptive (AIMD) delay between requests.
+
+Instead of sleeping a fixed 3 s and then 3-6 s between pages:
+  - wait_until_ready() returns as soon as the DOM has result cards (or shows a
+    challenge page), using the navigation response status as the network signal
+  - AdaptiveDelay shrinks the pause additively while pages come back fast and
+    clean, and multiplies it when latency or challenge pages rise
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+
+# Mirrors the needles in scrap.is_challenge
+READY_JS = """
+() => {
+    if (document.querySelector('ul.srp-results li.s-card, ul.srp-results li.s-item')) return 'results';
+    const text = ((document.title || '') + ' ' +
+                  (document.body ? document.body.textContent.slice(0, 5000) : '')).toLowerCase();
+    const needles = ['checking your browser before you access', 'attention required',
+                     'enable javascript and cookies', 'verify you are a human'];
+    if (needles.some(n => text.includes(n))) return 'challenge';
+    if (document.readyState === 'complete' && document.querySelector('ul.srp-results')) return 'results';
+    return null;
+}
+"""
+
+
+def _readiness(state: Optional[str], status: Optional[int], started: float) -> Dict:
+    if status is not None and status >= 400:
+        state = 'challenge' if status in (403, 429, 503) else 'error'
+    return {'state': state or 'timeout', 'status': status, 'wait': time.perf_counter() - started}
+
+
+def wait_until_ready(page, response=None, timeout: int = 15000) -> Dict:
+    """
+    Block until the results list is populated or a challenge page shows up.
+    Returns {'state': 'results'|'challenge'|'error'|'timeout', 'status', 'wait'}.
+    """
+    started = time.perf_counter()
+    status = response.status if response is not None else None
+    try:
+        handle = page.wait_for_function(READY_JS, timeout=timeout, polling=100)
+        state = handle.json_value()
+    except Exception:
+        state = None
+    return _readiness(state, status, started)
+
+
+async def async_wait_until_ready(page, response=None, timeout: int = 15000) -> Dict:
+    """
+    Async version of wait_until_ready
+    """
+    started = time.perf_counter()
+    status = response.status if response is not None else None
+    try:
+        handle = await page.wait_for_function(READY_JS, timeout=timeout, polling=100)
+        state = await handle.json_value()
+    except Exception:
+        state = None
+    return _readiness(state, status, started)
+
+
+class AdaptiveDelay:
+    """
+    AIMD pause between requests.
+    - fast, clean page: delay -= step           (additive decrease)
+    - slow page or challenge: delay *= backoff  (multiplicative increase)
+    The delay always stays within [min_delay, max_delay].
+    """
+
+    def __init__(self, initial: float = 3.0, min_delay: float = 0.5, max_delay: float = 60.0,
+                 step: float = 0.5, backoff: float = 2.0, slow_after: float = 5.0, jitter: float = 0.25):
+        self.delay = initial
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.step = step
+        self.backoff = backoff
+        self.slow_after = slow_after
+        self.jitter = jitter
+
+    def record(self, latency: float, ok: bool = True) -> float:
+        """
+        Feed one page outcome (load latency in seconds) and return the new delay
+        """
+        if ok and latency < self.slow_after:
+            self.delay = max(self.min_delay, self.delay - self.step)
+        else:
+            self.delay = min(self.max_delay, self.delay * self.backoff)
+        return self.delay
+
+    def next_delay(self) -> float:
+        return self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def sleep(self) -> float:
+        delay = self.next_delay()
+        time.sleep(delay)
+        return delay
+
+    async def async_sleep(self) -> float:
+        delay = self.next_delay()
+        await asyncio.sleep(delay)
+        return delay
@@ -0,0 +1,69 @@
+"""
+Up-front pagination plan from the first results page.
+
+Page 1 carries the total in its header ("<span class="BOLD">720</span> results
+for ..." inside h1.srp-controls__count-heading). With the page size from _ipg the
+exact number of pages is known after one fetch, so the rest can be dispatched at
+once instead of discovering a.pagination__next one page at a time.
+
+When the header is missing (layout change, challenge page) plan_pages returns
+None and callers keep following the "next" link.
+"""
+
+import math
+import re
+from typing import List, Optional
+
+from scrape_with_playwright import DEFAULT_PARAMS
+
+# eBay's page size when _ipg isn't given
+DEFAULT_PAGE_SIZE = 60
+
+COUNT_RE = re.compile(
+    r'class="srp-controls__count-heading"[^>]*>(?:(?!</h1>).){0,200}?<span class="BOLD">([\d,]+)(\+?)</span>',
+    re.S,
+)
+IPG_RE = re.compile(r'^_ipg=(\d+)$')
+
+
+def result_count(html: str) -> Optional[int]:
+    """
+    Total results from the count heading ("1,234+" -> 1234), None if absent
+    """
+    m = COUNT_RE.search(html)
+    return int(m.group(1).replace(",", "")) if m else None
+
+
+def count_from_text(text: Optional[str]) -> Optional[int]:
+    """
+    Total results from the count heading's text as the browser reads it ("1,234+")
+    """
+    digits = (text or "").strip().rstrip("+").replace(",", "")
+    return int(digits) if digits.isdigit() else None
+
+
+def page_size(params: Optional[List[str]]) -> int:
+    """
+    Items per page from the _ipg param (search params as "key=value" strings)
+    """
+    for param in DEFAULT_PARAMS if params is None else params:
+        m = IPG_RE.match(param)
+        if m:
+            return int(m.group(1))
+    return DEFAULT_PAGE_SIZE
+
+
+def plan_pages(html: str, params: Optional[List[str]], max_pages: int) -> Optional[int]:
+    """
+    How many pages (capped at max_pages) this query has, from its first page
+    """
+    return pages_for_count(result_count(html), params, max_pages)
+
+
+def pages_for_count(total: Optional[int], params: Optional[List[str]], max_pages: int) -> Optional[int]:
+    """
+    plan_pages for a result count that was already read (e.g. in the browser)
+    """
+    if total is None:
+        return None
+    return min(max_pages, math.ceil(total / page_size(params)))
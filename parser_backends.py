@@ -0,0 +1,525 @@
+"""
+Pluggable HTML parser backends for results pages.
+
+Every backend parses a page once (parse) and reads the same raw cards from the
+tree - one per <li> under ul.srp-results, {title, price, sold, link, image} -
+plus the "next" link; the shared helpers below turn cards into records, so
+swapping the backend never changes the output:
+
+  html.parser  BeautifulSoup + the pure-Python parser (the original code path)
+  lxml         lxml.html with precompiled XPath (C parser)
+  selectolax   selectolax's Lexbor engine (C parser, CSS selectors)
+
+The card fields follow scrape_with_playwright.extract_page_items exactly,
+including its sold-date lookup: span.POSITIVE, else the first span whose only
+content is a string containing "Sold". (Its third, class-name fallback can never
+match - BeautifulSoup hands the lambda one class string at a time - so the fast
+backends leave it out.) For the older s-item layout used by scrap.parse_items,
+backends provide node/selector primitives and s_items() runs the fallback chain
+(or a cached plan from layout_plans.py) on top of them.
+
+lxml and selectolax are optional; asking for a missing one raises ImportError.
+
+Subtree mode (parse_results): only ul.srp-results matters, so it is cut out of
+the raw markup by balancing <ul>/</ul> tags from its opening tag, and just that
+fragment is parsed, minus the inline SVG icons in the cards. The header, footer,
+scripts and carousels around the list never become a tree. The "next" link sits
+outside the list and is read with a regex (has_next_link).
+
+Usage:
+  python parser_backends.py playwright_rendered.html ebay_iphone.html   # parity + timing per backend
+
+The benchmark also times scrap.is_challenge, the check scrap.py runs before
+parsing.
+"""
+
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+DEFAULT_BACKEND = "html.parser"
+OPENS_IN_NEW_TAB = 'Opens in a new window or tab'
+
+Card = Dict[str, Optional[str]]
+
+# scrap.parse_items' s-item layout: node strategies, then selectors per field, in priority order
+S_ITEM_NODES = ('links', 'wrappers', 'generic')
+S_ITEM_FIELDS = {
+    'title': (".s-item__title", "[data-testid='item-title']", "h3"),
+    'link': ("a.s-item__link", "a[href*='/itm/']"),
+    'price': (".s-item__price", "[data-testid='item-price']"),
+    'image': ("img.s-item__image-img", ".s-item__image-wrapper img", "img"),
+}
+IMAGE_ATTRS = ("src", "data-src", "data-image-src")
+
+RESULTS_START_RE = re.compile(r'<ul\b[^>]*\bclass="(?:[^"]*\s)?srp-results(?:\s[^"]*)?"[^>]*>')
+SVG_RE = re.compile(r'<svg\b.*?</svg\s*>', re.IGNORECASE | re.DOTALL)
+UL_TAG_RE = re.compile(r'<(/?)ul\b[^>]*>', re.IGNORECASE)
+NEXT_CLASS = 'class="pagination__next'
+A_TAG_RE = re.compile(r'<a\s')
+
+
+def _has_sold(text) -> bool:
+    return bool(text) and 'Sold' in text
+
+
+class HtmlParserBackend:
+    """
+    BeautifulSoup with html.parser
+    """
+    name = "html.parser"
+
+    def __init__(self):
+        self._css: Dict[str, object] = {}
+
+    def parse(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, 'html.parser')
+
+    def cards(self, soup: BeautifulSoup) -> Optional[List[Card]]:
+        results_list = soup.find('ul', {'class': 'srp-results'})
+        if not results_list:
+            return None
+        cards = []
+        for item in results_list.find_all('li'):
+            title_elem = item.find('div', {'role': 'heading'})
+            price_elem = item.find('span', class_='s-card__price')
+            sold_elem = item.find('span', class_='POSITIVE') or item.find('span', string=_has_sold)
+            link_elem = item.find('a', href=lambda x: x and '/itm/' in x if x else False)
+            img_elem = item.find('img')
+            cards.append({
+                'title': title_elem.get_text(strip=True) if title_elem else None,
+                'price': price_elem.get_text(strip=True) if price_elem else None,
+                'sold': sold_elem.get_text(strip=True) if sold_elem else None,
+                'link': link_elem.get('href', '') if link_elem else None,
+                'image': img_elem.get('src', 'N/A') if img_elem else None,
+            })
+        return cards
+
+    def has_next(self, soup: BeautifulSoup) -> bool:
+        next_button = soup.find('a', class_='pagination__next')
+        return bool(next_button) and 'pagination__next--disabled' not in ' '.join(next_button.get('class', []))
+
+    def _compiled(self, selector: str):
+        if selector not in self._css:
+            self._css[selector] = soupsieve.compile(selector)
+        return self._css[selector]
+
+    def s_nodes(self, soup: BeautifulSoup, strategy: str) -> List:
+        if strategy == 'links':
+            return self._compiled("li.s-item:has(a.s-item__link)").select(soup)
+        if strategy == 'wrappers':
+            return self._compiled("div.s-item__wrapper.clearfix").select(soup)
+        title = self._compiled(".s-item__title")
+        return [c for c in self._compiled(".s-item").select(soup) if title.select_one(c)]
+
+    def s_first(self, node, selector: str):
+        return self._compiled(selector).select_one(node)
+
+    @staticmethod
+    def s_text(el) -> str:
+        return el.get_text(strip=True)
+
+    @staticmethod
+    def s_attr(el, name: str) -> Optional[str]:
+        return el.get(name)
+
+
+def _class_test(name: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+class LxmlBackend:
+    """
+    lxml.html with compiled XPath expressions
+    """
+    name = "lxml"
+
+    def __init__(self):
+        try:
+            import lxml.html
+            from lxml import etree
+        except ImportError as e:
+            raise ImportError("The lxml backend needs lxml (pip install lxml)") from e
+        self._html, self._etree = lxml.html, etree
+        xp = etree.XPath
+        self.x_results = xp(f'(//ul[{_class_test("srp-results")}])[1]')
+        self.x_lis = xp('.//li')
+        self.x_heading = xp('(.//div[@role="heading"])[1]')
+        self.x_price = xp(f'(.//span[{_class_test("s-card__price")}])[1]')
+        self.x_positive = xp(f'(.//span[{_class_test("POSITIVE")}])[1]')
+        self.x_spans = xp('.//span')
+        self.x_link = xp('(.//a[contains(@href, "/itm/")])[1]')
+        self.x_img = xp('(.//img)[1]')
+        self.x_next = xp(f'(//a[{_class_test("pagination__next")}])[1]')
+        self.x_s_item_links = xp(f'//li[{_class_test("s-item")} and .//a[{_class_test("s-item__link")}]]')
+        self.x_s_item_wrappers = xp(f'//div[{_class_test("s-item__wrapper")} and {_class_test("clearfix")}]')
+        self.x_s_items = xp(f'//*[{_class_test("s-item")}]')
+        self.x_s_title = xp(f'(.//*[{_class_test("s-item__title")}])[1]')
+        # The CSS selectors scrap.parse_items uses, as XPath
+        self.s_item_paths = {
+            ".s-item__title": self.x_s_title,
+            "[data-testid='item-title']": xp('(.//*[@data-testid="item-title"])[1]'),
+            "h3": xp('(.//h3)[1]'),
+            "a.s-item__link": xp(f'(.//a[{_class_test("s-item__link")}])[1]'),
+            "a[href*='/itm/']": xp('(.//a[contains(@href, "/itm/")])[1]'),
+            ".s-item__price": xp(f'(.//*[{_class_test("s-item__price")}])[1]'),
+            "[data-testid='item-price']": xp('(.//*[@data-testid="item-price"])[1]'),
+            "img.s-item__image-img": xp(f'(.//img[{_class_test("s-item__image-img")}])[1]'),
+            ".s-item__image-wrapper img": xp(f'(.//*[{_class_test("s-item__image-wrapper")}]//img)[1]'),
+            "img": xp('(.//img)[1]'),
+        }
+
+    def parse(self, html: str):
+        return self._html.document_fromstring(html)
+
+    @staticmethod
+    def _text(el) -> str:
+        return ''.join(t.strip() for t in el.itertext())
+
+    def _string(self, el) -> Optional[str]:
+        # BeautifulSoup's Tag.string: the text of an element whose only child node is a string
+        children = list(el)
+        text = el.text or None
+        if not children:
+            return text
+        if text or len(children) > 1 or children[0].tail:
+            return None
+        child = children[0]
+        if isinstance(child, self._etree._Comment):
+            return child.text
+        return self._string(child) if isinstance(child.tag, str) else None
+
+    @staticmethod
+    def _first(found):
+        return found[0] if found else None
+
+    def cards(self, doc) -> Optional[List[Card]]:
+        results_list = self._first(self.x_results(doc))
+        if results_list is None:
+            return None
+        cards = []
+        for item in self.x_lis(results_list):
+            title_elem = self._first(self.x_heading(item))
+            price_elem = self._first(self.x_price(item))
+            sold_elem = self._first(self.x_positive(item))
+            if sold_elem is None:
+                sold_elem = next((s for s in self.x_spans(item) if _has_sold(self._string(s))), None)
+            link_elem = self._first(self.x_link(item))
+            img_elem = self._first(self.x_img(item))
+            cards.append({
+                'title': self._text(title_elem) if title_elem is not None else None,
+                'price': self._text(price_elem) if price_elem is not None else None,
+                'sold': self._text(sold_elem) if sold_elem is not None else None,
+                'link': link_elem.get('href', '') if link_elem is not None else None,
+                'image': img_elem.get('src', 'N/A') if img_elem is not None else None,
+            })
+        return cards
+
+    def has_next(self, doc) -> bool:
+        next_button = self._first(self.x_next(doc))
+        return next_button is not None and 'pagination__next--disabled' not in next_button.get('class', '')
+
+    def s_nodes(self, doc, strategy: str) -> List:
+        if strategy == 'links':
+            return self.x_s_item_links(doc)
+        if strategy == 'wrappers':
+            return self.x_s_item_wrappers(doc)
+        return [n for n in self.x_s_items(doc) if self.x_s_title(n)]
+
+    def s_first(self, node, selector: str):
+        return self._first(self.s_item_paths[selector](node))
+
+    def s_text(self, el) -> str:
+        return self._text(el)
+
+    @staticmethod
+    def s_attr(el, name: str) -> Optional[str]:
+        return el.get(name)
+
+
+class SelectolaxBackend:
+    """
+    selectolax's Lexbor parser with CSS selectors
+    """
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError as e:
+            raise ImportError("The selectolax backend needs selectolax (pip install selectolax)") from e
+        self._parser = LexborHTMLParser
+
+    @staticmethod
+    def _text(node) -> str:
+        return node.text(deep=True, separator='', strip=True)
+
+    def _string(self, node) -> Optional[str]:
+        # BeautifulSoup's Tag.string: the text of an element whose only child node is a string
+        child = node.child
+        if child is None or child.next is not None:
+            return None
+        if child.tag == '-text':
+            return child.text_content
+        if child.tag == '_comment':
+            return child.comment_content
+        return self._string(child)
+
+    def parse(self, html: str):
+        return self._parser(html)
+
+    def cards(self, tree) -> Optional[List[Card]]:
+        results_list = tree.css_first('ul.srp-results')
+        if results_list is None:
+            return None
+        cards = []
+        for item in results_list.css('li'):
+            title_elem = item.css_first('div[role="heading"]')
+            price_elem = item.css_first('span.s-card__price')
+            sold_elem = item.css_first('span.POSITIVE')
+            if sold_elem is None:
+                sold_elem = next((s for s in item.css('span') if _has_sold(self._string(s))), None)
+            link_elem = item.css_first('a[href*="/itm/"]')
+            img_elem = item.css_first('img')
+            cards.append({
+                'title': self._text(title_elem) if title_elem is not None else None,
+                'price': self._text(price_elem) if price_elem is not None else None,
+                'sold': self._text(sold_elem) if sold_elem is not None else None,
+                'link': (link_elem.attributes.get('href') or '') if link_elem is not None else None,
+                'image': (img_elem.attributes.get('src', 'N/A') if img_elem is not None else None),
+            })
+        return cards
+
+    def has_next(self, tree) -> bool:
+        next_button = tree.css_first('a.pagination__next')
+        return (next_button is not None
+                and 'pagination__next--disabled' not in (next_button.attributes.get('class') or ''))
+
+    @staticmethod
+    def s_nodes(tree, strategy: str) -> List:
+        if strategy == 'links':
+            return [n for n in tree.css("li.s-item") if n.css_first("a.s-item__link") is not None]
+        if strategy == 'wrappers':
+            return tree.css("div.s-item__wrapper.clearfix")
+        return [n for n in tree.css(".s-item") if n.css_first(".s-item__title") is not None]
+
+    @staticmethod
+    def s_first(node, selector: str):
+        return node.css_first(selector)
+
+    def s_text(self, el) -> str:
+        return self._text(el)
+
+    @staticmethod
+    def s_attr(el, name: str) -> Optional[str]:
+        return el.attributes.get(name)
+
+
+BACKENDS = {
+    HtmlParserBackend.name: HtmlParserBackend,
+    LxmlBackend.name: LxmlBackend,
+    SelectolaxBackend.name: SelectolaxBackend,
+}
+_instances: Dict[str, object] = {}
+
+
+def get_backend(name: Optional[str] = None):
+    """
+    Shared backend instance by name (default: html.parser)
+    """
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend {name!r} (choose from {', '.join(BACKENDS)})")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+# ----- subtree mode -----
+def results_fragment(html: str) -> Optional[str]:
+    """
+    The ul.srp-results element as a markup slice, None if the page has none
+    """
+    start = RESULTS_START_RE.search(html)
+    if not start:
+        return None
+    depth = 1
+    for tag in UL_TAG_RE.finditer(html, start.end()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html[start.start():tag.end()]
+    return html[start.start():]
+
+
+def has_next_link(html: str) -> bool:
+    """
+    has_next without a tree
+    """
+    # Find the class literal, then check it belongs to an <a> tag
+    pos = html.find(NEXT_CLASS)
+    while pos != -1:
+        end = html.find('"', pos + len(NEXT_CLASS))
+        classes = html[pos + len(NEXT_CLASS):end]
+        tag_start = html.rfind('<', 0, pos)
+        if ((not classes or classes[0] == ' ') and A_TAG_RE.match(html, tag_start)
+                and '>' not in html[tag_start:pos]):
+            return 'pagination__next--disabled' not in classes
+        pos = html.find(NEXT_CLASS, pos + 1)
+    return False
+
+
+def parse_results(parser, html: str):
+    """
+    Tree of just the results list (the whole page if it can't be located)
+    """
+    fragment = results_fragment(html)
+    return parser.parse(html if fragment is None else SVG_RE.sub('', fragment))
+
+
+# ----- s-item layout -----
+def s_items(parser, tree, plan: Optional[Dict] = None) -> List[Card]:
+    """
+    s-item cards as scrap.parse_items reads them. A plan ({'nodes': [...],
+    'fields': {field: [selectors]}}) replaces the full chains; it must keep their
+    priority order and only leave out what cannot match (see layout_plans.py).
+    """
+    strategies = plan['nodes'] if plan else S_ITEM_NODES
+    fields = plan['fields'] if plan else S_ITEM_FIELDS
+    nodes = []
+    for strategy in strategies:
+        nodes = parser.s_nodes(tree, strategy)
+        if nodes:
+            break
+    items = []
+    for node in nodes:
+        found = {}
+        for field, selectors in fields.items():
+            found[field] = None
+            for selector in selectors:
+                el = parser.s_first(node, selector)
+                if el is not None:
+                    found[field] = el
+                    break
+        image = None
+        if found['image'] is not None:
+            for attr in IMAGE_ATTRS:
+                image = parser.s_attr(found['image'], attr)
+                if image:
+                    break
+        items.append({
+            'title': parser.s_text(found['title']) if found['title'] is not None else None,
+            'link': (parser.s_attr(found['link'], "href") or "") if found['link'] is not None else None,
+            'price': parser.s_text(found['price']) if found['price'] is not None else None,
+            'image': image,
+        })
+    return items
+
+
+# ----- cards -> records -----
+def listing_rows(cards: Optional[List[Card]], page_num: int) -> Optional[List[Dict]]:
+    """
+    Records as scrape_with_playwright.extract_page_items builds them
+    """
+    if cards is None:
+        return None
+    rows = []
+    for card in cards:
+        if card['title'] is None:
+            continue
+        title = card['title'].replace(OPENS_IN_NEW_TAB, '').strip()
+        if not title or len(title) < 10 or card['link'] is None:
+            continue
+        rows.append({
+            'Page': page_num,
+            'Title': title,
+            'Price': card['price'] if card['price'] is not None else 'N/A',
+            'Sold Date': card['sold'] if card['sold'] is not None else 'N/A',
+            'Link': card['link'].split('?')[0],
+            'Image Link': card['image'] if card['image'] is not None else 'N/A',
+        })
+    return rows
+
+
+def saved_page_rows(cards: Optional[List[Card]]) -> List[Dict]:
+    """
+    Records as final_scraper.parse_ebay_html builds them
+    """
+    rows = []
+    for card in cards or []:
+        if card['title'] is None or card['link'] is None:
+            continue
+        rows.append({
+            'Title': card['title'].replace(OPENS_IN_NEW_TAB, '').strip(),
+            'Price': card['price'] if card['price'] is not None else 'N/A',
+            'Link': card['link'].split('?')[0],
+            'Image Link': card['image'] if card['image'] is not None else 'N/A',
+        })
+    return rows
+
+
+def s_item_rows(items: List[Card]) -> List[Dict]:
+    """
+    Records as scrap.parse_items builds them
+    """
+    return [
+        {'Title': item['title'], 'Price': item['price'], 'Link': item['link'].split("?")[0],
+         'Image Link': item['image']}
+        for item in items
+        if item['title'] is not None and item['link'] is not None
+    ]
+
+
+def parse_listing_page(html: str, page_num: int, backend: Optional[str] = None, subtree: bool = True):
+    """
+    (rows, has_next) for a results page with the chosen backend
+    """
+    parser = get_backend(backend)
+    if subtree:
+        return listing_rows(parser.cards(parse_results(parser, html)), page_num), has_next_link(html)
+    tree = parser.parse(html)
+    return listing_rows(parser.cards(tree), page_num), parser.has_next(tree)
+
+
+def main():
+    from scrap import is_challenge
+    from scrape_with_playwright import extract_page_items, has_next_page
+
+    paths = sys.argv[1:] or ["playwright_rendered.html", "ebay_iphone.html"]
+    different = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        print(f"\n{path}")
+        start = time.perf_counter()
+        soup = BeautifulSoup(html, 'html.parser')
+        reference = extract_page_items(soup, 1), has_next_page(soup)
+        print(f"  {'extract_page_items':<20} {(time.perf_counter() - start) * 1000:8.0f} ms  "
+              f"{len(reference[0] or []):4d} rows")
+        start = time.perf_counter()
+        challenge = is_challenge(html)
+        print(f"  {'is_challenge':<20} {(time.perf_counter() - start) * 1000:8.1f} ms  "
+              f"{'challenge' if challenge else 'clean'}")
+        for name in BACKENDS:
+            try:
+                parser = get_backend(name)
+            except ImportError as e:
+                print(f"  {name:<20} skipped ({e})")
+                continue
+            for subtree in (False, True):
+                start = time.perf_counter()
+                rows, has_next = parse_listing_page(html, 1, name, subtree)
+                elapsed = time.perf_counter() - start
+                verdict = "identical" if (rows, has_next) == reference else "❌ DIFFERENT"
+                different += verdict != "identical"
+                label = f"{name} (subtree)" if subtree else name
+                print(f"  {label:<20} {elapsed * 1000:8.0f} ms  {len(rows or []):4d} rows  {verdict}")
+    if different:
+        sys.exit(f"\n❌ {different} backend run(s) differ from extract_page_items")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Pipelined fetch/parse: browser tabs only navigate and capture HTML, and parsing
+runs in a process pool fed through a bounded queue.
+
+Fetch and parse overlap, so throughput is set by the slower stage instead of the
+sum of both. The bounded queue applies backpressure: when parsers fall behind,
+fetchers wait instead of piling up multi-MB pages in memory.
+
+Usage:
+  python pipeline.py --pages 10 --fetchers 3 --parsers 4
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from playwright.async_api import async_playwright
+
+from async_scraper import PolitenessLimiter, fetch_page, parse_page
+from browser_profile import context_options, launch_args
+from html_cache import HtmlCache
+from page_readiness import AdaptiveDelay
+from resource_policy import ResourcePolicy
+from scrape_with_playwright import DEFAULT_QUERY
+
+OUTPUT_CSV = "ebay_pipelined_results.csv"
+_DONE = None  # queue sentinel
+
+
+async def run_pipeline(fetch: Callable[[int], Awaitable[Optional[str]]], max_pages: int, fetchers: int,
+                       parsers: int, queue_size: int = 4,
+                       parse: Callable[[str, int], Tuple] = parse_page) -> Tuple[List[Dict], Dict]:
+    """
+    Run pages 1..max_pages through `fetchers` fetch tasks and `parsers` parser processes.
+    fetch(page_num) returns the page's HTML or None; parse(html, page_num) returns (rows, has_next).
+    A page whose parse raises is logged, counted in stats["failed"] and ends the run there
+    (later pages are dropped, as when fetch returns None). If the process pool breaks,
+    the fetchers are cancelled and BrokenProcessPool is raised.
+    -> (rows, stats)
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    pages = iter(range(1, max_pages + 1))
+    results: Dict[int, List[Dict]] = {}
+    stats: Dict = {"fetch": 0.0, "parse": 0.0, "failed": []}
+    broken: List[BaseException] = []
+    last_page = max_pages
+    loop = asyncio.get_running_loop()
+
+    async def fetcher() -> None:
+        nonlocal last_page
+        for page_num in pages:
+            if page_num > last_page:
+                break
+            start = time.perf_counter()
+            try:
+                html = await fetch(page_num)
+            except Exception as e:
+                print(f"❌ Error on page {page_num}: {e}")
+                html = None
+            stats["fetch"] += time.perf_counter() - start
+            if html is None:
+                last_page = min(last_page, page_num - 1)
+                break
+            await queue.put((page_num, html))  # waits while parsers are behind
+
+    async def parser(executor: ProcessPoolExecutor) -> None:
+        nonlocal last_page
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            if broken:
+                continue  # keep draining so nothing blocks on the queue
+            page_num, html = item
+            start = time.perf_counter()
+            try:
+                rows, has_next = await loop.run_in_executor(executor, parse, html, page_num)
+            except BrokenProcessPool as e:
+                print(f"❌ Parser pool broke on page {page_num}: {e}")
+                broken.append(e)
+                for task in fetch_tasks:
+                    task.cancel()
+                continue
+            except Exception as e:
+                print(f"❌ Parse error on page {page_num}: {e}")
+                stats["failed"].append(page_num)
+                last_page = min(last_page, page_num - 1)
+                continue
+            finally:
+                stats["parse"] += time.perf_counter() - start
+            if rows is None:
+                last_page = min(last_page, page_num - 1)
+                continue
+            if not has_next:
+                last_page = min(last_page, page_num)
+            results[page_num] = rows
+            print(f"✓ Parsed page {page_num}: {len(rows)} items")
+
+    with ProcessPoolExecutor(max_workers=parsers) as executor:
+        fetch_tasks = [asyncio.create_task(fetcher()) for _ in range(fetchers)]
+        parser_tasks = [asyncio.create_task(parser(executor)) for _ in range(parsers)]
+        await asyncio.gather(*fetch_tasks, return_exceptions=True)
+        for _ in parser_tasks:
+            await queue.put(_DONE)
+        await asyncio.gather(*parser_tasks)
+    if broken:
+        raise broken[0]
+
+    all_items = []
+    for page_num in sorted(results):
+        if page_num <= last_page:
+            all_items.extend(results[page_num])
+    return all_items, stats
+
+
+async def scrape_ebay_pipelined(max_pages: int = 3, fetchers: int = 2, parsers: Optional[int] = None,
+                                queue_size: int = 4, min_interval: float = 1.5, query: str = DEFAULT_QUERY,
+                                params: Optional[List[str]] = None, headless: bool = True,
+                                block_resources: bool = True, use_cache: bool = True) -> List[Dict]:
+    """
+    Fetch pages 1..max_pages with `fetchers` tabs and parse them in `parsers` processes
+    """
+    parsers = parsers or max(1, (os.cpu_count() or 2) - 1)
+    limiter = PolitenessLimiter(min_interval, adaptive=AdaptiveDelay(initial=2 * min_interval, min_delay=min_interval))
+    policy = ResourcePolicy.load() if block_resources else None
+    cache = HtmlCache() if use_cache else None
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless, args=launch_args())
+        context = await browser.new_context(**context_options())
+
+        async def fetch(page_num: int) -> Optional[str]:
+            return await fetch_page(context, page_num, limiter, query, params, policy, cache)
+
+        wall_start = time.perf_counter()
+        try:
+            all_items, stats = await run_pipeline(fetch, max_pages, fetchers, parsers, queue_size)
+        finally:
+            await browser.close()
+            if cache is not None:
+                cache.close()
+        wall = time.perf_counter() - wall_start
+
+    failed = f" | parse failed on page(s) {', '.join(map(str, stats['failed']))}" if stats["failed"] else ""
+    print(f"\n⏱ wall {wall:.1f}s | fetch busy {stats['fetch']:.1f}s | parse busy {stats['parse']:.1f}s "
+          f"({fetchers} fetchers, {parsers} parsers){failed}")
+    return all_items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape eBay results with overlapped fetch and parse stages.")
+    parser.add_argument("--query", "-q", type=str, default=DEFAULT_QUERY, help=f"Search query (default: {DEFAULT_QUERY})")
+    parser.add_argument("--pages", type=int, default=3, help="Number of pages to scrape (default: 3)")
+    parser.add_argument("--fetchers", type=int, default=2, help="Browser tabs fetching pages (default: 2)")
+    parser.add_argument("--parsers", type=int, default=0, help="Parser processes (default: CPU count - 1)")
+    parser.add_argument("--queue-size", type=int, default=4, help="Max fetched pages waiting to be parsed (default: 4)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--out", "-o", type=str, default=OUTPUT_CSV, help=f"Output CSV (default: {OUTPUT_CSV})")
+    args = parser.parse_args()
+
+    items = asyncio.run(scrape_ebay_pipelined(args.pages, args.fetchers, args.parsers or None, args.queue_size,
+                                              query=args.query, headless=not args.headed))
+    if not items:
+        print("\n❌ No items scraped")
+        return
+    pd.DataFrame(items).to_csv(args.out, index=False)
+    print(f"\n✅ Scraped {len(items)} items -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Offline replay of recorded eBay results pages, plus an end-to-end crawl benchmark
+against it, so throughput can be measured with no network.
+
+The server answers /sch/i.html?_nkw=...&_pgn=... from recorded pages:
+  - the captured fixtures (playwright_rendered.html, ebay_iphone.html)
+  - optionally every page in html_cache/ (--from-cache)
+A page that was never recorded is replayed from that query's recorded pages in
+rotation (or any recording, for an unknown query); --strict returns 404 instead.
+Latency (--latency/--jitter seconds) and failures (--error-rate, answered with a
+503 or 429 like eBay's throttling) can be injected.
+
+The benchmark starts a replay server in the background, points the crawlers at
+it through EBAY_BASE_URL and runs fetch -> parse -> CSV export:
+  http     keep-alive requests session (tiered_fetcher.make_session) in a thread
+           pool, parse in a process pool, rows streamed through a CsvSink
+  browser  pipeline.scrape_ebay_pipelined (Playwright tabs + process pool), then CsvSink
+
+Usage:
+  python replay_server.py serve --port 8800 --latency 0.3 --error-rate 0.05
+  python replay_server.py bench --pages 20 --concurrency 8
+  python replay_server.py bench --mode browser --pages 10 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from async_scraper import parse_page
+from html_cache import HtmlCache
+from row_sink import CsvSink
+from scrape_with_playwright import build_search_url
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_PORT = 8800
+SEARCH_PATH = "/sch/i.html"
+
+FIXTURES = {
+    "Samsung Galaxy S22": [HERE / "playwright_rendered.html"],
+    "iPhone 15 Pro Max": [HERE / "ebay_iphone.html"],
+}
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.replace("+", " ").lower().split())
+
+
+class ReplayStore:
+    """
+    Recorded pages by (normalized _nkw, _pgn), kept raw and gzipped
+    """
+
+    def __init__(self):
+        self.pages: Dict[str, Dict[int, Dict[str, bytes]]] = {}
+
+    def add(self, query: str, page_num: int, html: bytes) -> None:
+        self.pages.setdefault(normalize_query(query), {})[page_num] = {
+            "raw": html,
+            "gzip": gzip.compress(html, compresslevel=6),
+        }
+
+    def add_fixtures(self, fixtures: Dict[str, List[Path]] = FIXTURES) -> None:
+        for query, paths in fixtures.items():
+            for page_num, path in enumerate(paths, 1):
+                if Path(path).exists():
+                    self.add(query, page_num, Path(path).read_bytes())
+
+    def add_cache(self, cache: HtmlCache) -> None:
+        for entry in cache.entries():
+            query = parse_qs(urlsplit(entry["url"]).query).get("_nkw", [""])[0]
+            if query:
+                self.add(query, entry["page"], cache.read(entry["digest"]).encode("utf-8"))
+
+    def lookup(self, query: str, page_num: int, strict: bool = False) -> Optional[Dict[str, bytes]]:
+        recorded = self.pages.get(normalize_query(query))
+        if recorded and page_num in recorded:
+            return recorded[page_num]
+        if strict or not self.pages:
+            return None
+        if not recorded:
+            recorded = {i: page for i, page in enumerate(
+                page for pages in self.pages.values() for page in pages.values())}
+        keys = sorted(recorded)
+        return recorded[keys[(page_num - 1) % len(keys)]]
+
+    def __len__(self) -> int:
+        return sum(len(pages) for pages in self.pages.values())
+
+
+def make_replay_server(store: ReplayStore, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                       latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                       strict: bool = False) -> ThreadingHTTPServer:
+    """
+    Threaded HTTP server replaying `store`; server.stats counts served/errors/missing
+    """
+    stats = {"served": 0, "errors": 0, "missing": 0, "bytes": 0}
+    stats_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+        def _count(self, key: str, n: int = 1) -> None:
+            with stats_lock:
+                stats[key] += n
+
+        def _reply(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path != SEARCH_PATH:
+                self._reply(404, b"")
+                return
+            if latency or jitter:
+                time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            if error_rate and random.random() < error_rate:
+                self._count("errors")
+                status = random.choice((503, 429))
+                self._reply(status, f"<html><body>Injected {status}</body></html>".encode(),
+                            {"Retry-After": "1"})
+                return
+            qs = parse_qs(parts.query)
+            query = qs.get("_nkw", [""])[0]
+            page_arg = qs.get("_pgn", ["1"])[0]
+            page = self.server.store.lookup(query, int(page_arg) if page_arg.isdigit() else 1, strict)
+            if page is None:
+                self._count("missing")
+                self._reply(404, b"<html><body>No recording</body></html>")
+                return
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body, headers = page["gzip"], {"Content-Encoding": "gzip"}
+            else:
+                body, headers = page["raw"], {}
+            self._count("served")
+            self._count("bytes", len(body))
+            self._reply(200, body, headers)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.store = store
+    server.stats = stats
+    return server
+
+
+def start_background(server: ThreadingHTTPServer) -> str:
+    """
+    Serve in a daemon thread; returns the search URL to use as EBAY_BASE_URL
+    """
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{SEARCH_PATH}"
+
+
+def bench_http(queries: List[str], max_pages: int, concurrency: int, parsers: Optional[int],
+               out: Path, retries: int = 2) -> Dict:
+    """
+    fetch (session + threads) -> parse (process pool) -> CsvSink for queries x pages
+    """
+    from tiered_fetcher import make_session
+
+    session = make_session(pool_size=concurrency)
+    counts = {"pages": 0, "items": 0, "failed": 0}
+
+    def fetch(url: str) -> Optional[str]:
+        for _ in range(retries + 1):
+            response = session.get(url, timeout=30)
+            if response.status_code == 200:
+                return response.text
+        return None
+
+    units = [(query, page_num) for query in queries for page_num in range(1, max_pages + 1)]
+    with ThreadPoolExecutor(max_workers=concurrency) as fetchers, \
+            ProcessPoolExecutor(max_workers=parsers) as parse_pool, CsvSink(out) as sink:
+        htmls = fetchers.map(lambda unit: (unit, fetch(build_search_url(unit[1], unit[0]))), units)
+        parsed = []
+        for (query, page_num), html in htmls:
+            if html is None:
+                counts["failed"] += 1
+                continue
+            parsed.append(((query, page_num), parse_pool.submit(parse_page, html, page_num)))
+        for (query, page_num), future in parsed:
+            rows, _ = future.result()
+            counts["pages"] += 1
+            for row in rows or []:
+                row["Query"] = query
+            sink.write(rows or [])
+            counts["items"] += len(rows or [])
+    session.close()
+    return counts
+
+
+def bench_browser(queries: List[str], max_pages: int, concurrency: int, parsers: Optional[int],
+                  out: Path) -> Dict:
+    """
+    pipeline.scrape_ebay_pipelined per query (no cache, no politeness delay) -> CsvSink
+    """
+    from pipeline import scrape_ebay_pipelined
+
+    counts = {"pages": 0, "items": 0, "failed": 0}
+    with CsvSink(out) as sink:
+        for query in queries:
+            rows = asyncio.run(scrape_ebay_pipelined(max_pages, fetchers=concurrency, parsers=parsers,
+                                                     min_interval=0.0, query=query, use_cache=False))
+            pages = len({row["Page"] for row in rows})
+            counts["pages"] += pages
+            counts["failed"] += max_pages - pages
+            counts["items"] += len(rows)
+            for row in rows:
+                row["Query"] = query
+            sink.write(rows)
+    return counts
+
+
+def benchmark(mode: str = "http", queries: Optional[List[str]] = None, max_pages: int = 10,
+              concurrency: int = 4, parsers: Optional[int] = None, latency: float = 0.0,
+              jitter: float = 0.0, error_rate: float = 0.0, from_cache: bool = False,
+              out: Path = Path("replay_benchmark.csv")) -> Dict:
+    """
+    Run one crawl mode end to end against a fresh replay server and report throughput
+    """
+    store = ReplayStore()
+    store.add_fixtures()
+    if from_cache:
+        cache = HtmlCache()
+        store.add_cache(cache)
+        cache.close()
+    queries = queries or list(FIXTURES)
+    server = make_replay_server(store, port=0, latency=latency, jitter=jitter, error_rate=error_rate)
+    previous = os.environ.get("EBAY_BASE_URL")
+    os.environ["EBAY_BASE_URL"] = start_background(server)
+    try:
+        start = time.perf_counter()
+        if mode == "browser":
+            counts = bench_browser(queries, max_pages, concurrency, parsers, out)
+        else:
+            counts = bench_http(queries, max_pages, concurrency, parsers, out)
+        elapsed = time.perf_counter() - start
+    finally:
+        if previous is None:
+            os.environ.pop("EBAY_BASE_URL", None)
+        else:
+            os.environ["EBAY_BASE_URL"] = previous
+        server.shutdown()
+        server.server_close()
+
+    result = {**counts, "mode": mode, "elapsed": elapsed, "server": dict(server.stats),
+              "pages_per_s": counts["pages"] / elapsed, "items_per_s": counts["items"] / elapsed}
+    print(f"\n{'='*60}")
+    print(f"REPLAY BENCHMARK ({mode}, {len(queries)} queries x {max_pages} pages, concurrency {concurrency})")
+    print(f"{'='*60}")
+    print(f"  {counts['pages']} pages, {counts['items']} items, {counts['failed']} failed in {elapsed:.1f}s")
+    print(f"  {result['pages_per_s']:.2f} pages/s  {result['items_per_s']:.0f} items/s")
+    print(f"  server: {server.stats['served']} served, {server.stats['errors']} injected errors, "
+          f"{server.stats['bytes'] / 1e6:.1f} MB sent")
+    print(f"  rows -> {out}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded eBay pages locally and benchmark crawls against them.")
+    parser.add_argument("command", choices=["serve", "bench"])
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"serve: port (default: {DEFAULT_PORT})")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- random seconds on top of --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 503/429")
+    parser.add_argument("--from-cache", action="store_true", help="Also replay every page in html_cache/")
+    parser.add_argument("--strict", action="store_true", help="serve: 404 for pages that were never recorded")
+    parser.add_argument("--mode", choices=["http", "browser"], default="http", help="bench: crawl path to run")
+    parser.add_argument("--query", "-q", action="append", help="bench: query to crawl (repeatable)")
+    parser.add_argument("--pages", type=int, default=10, help="bench: pages per query (default: 10)")
+    parser.add_argument("--concurrency", type=int, default=4, help="bench: fetchers in flight (default: 4)")
+    parser.add_argument("--parsers", type=int, default=0, help="bench: parser processes (default: CPU count)")
+    parser.add_argument("--out", "-o", type=str, default="replay_benchmark.csv", help="bench: output CSV")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.mode, args.query, args.pages, args.concurrency, args.parsers or None, args.latency,
+                  args.jitter, args.error_rate, args.from_cache, Path(args.out))
+        return
+
+    store = ReplayStore()
+    store.add_fixtures()
+    if args.from_cache:
+        cache = HtmlCache()
+        store.add_cache(cache)
+        cache.close()
+    server = make_replay_server(store, "127.0.0.1", args.port, args.latency, args.jitter, args.error_rate,
+                                args.strict)
+    print(f"✓ Replaying {len(store)} recorded pages on http://127.0.0.1:{args.port}{SEARCH_PATH}")
+    print(f"  crawl against it with EBAY_BASE_URL=http://127.0.0.1:{args.port}{SEARCH_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
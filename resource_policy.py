@@ -0,0 +1,223 @@
+"""
+Block resources we never use during a crawl (images, fonts, CSS, trackers).
+
+We only parse the HTML, and image URLs come from the <img src> attribute, so the
+browser doesn't need to download them. ResourcePolicy hooks page.route() and aborts
+requests by resource type and by domain (allow/deny lists), and keeps per-page
+stats of what was blocked.
+
+Config (JSON, all keys optional - see DEFAULT_CONFIG):
+  {
+    "block_types": ["image", "font", "stylesheet", "media"],
+    "deny_domains": ["doubleclick.net", "googletagmanager.com"],
+    "allow_domains": ["ebay.com", "ebaystatic.com"],
+    "block_third_party": true
+  }
+
+Bytes saved are estimated from the average size per resource type; run
+  python resource_policy.py --measure
+to load a page with and without the policy and print the measured difference.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+DEFAULT_CONFIG_FILE = Path(__file__).resolve().parent / "resource_policy.json"
+
+DEFAULT_CONFIG = {
+    "block_types": ["image", "font", "stylesheet", "media", "imageset", "texttrack", "manifest"],
+    "deny_domains": [
+        "doubleclick.net", "googletagmanager.com", "google-analytics.com", "googlesyndication.com",
+        "facebook.net", "scorecardresearch.com", "criteo.com", "adnxs.com", "bing.com",
+    ],
+    # Only hosts on this list may serve scripts/XHR when block_third_party is on
+    "allow_domains": ["ebay.com", "ebaystatic.com", "ebayimg.com", "ebayrtm.com"],
+    "block_third_party": True,
+    # Rough average size per blocked request, used for the bytes-saved estimate
+    "avg_bytes": {"image": 25000, "font": 40000, "stylesheet": 30000, "media": 200000,
+                  "script": 60000, "xhr": 5000, "fetch": 5000, "other": 5000},
+}
+
+
+def _host_matches(host: str, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class ResourcePolicy:
+    """
+    Decides which requests to abort and keeps per-page stats.
+    Use install() for sync pages and install_async() for async pages.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = {**DEFAULT_CONFIG, **(config or {})}
+        self.block_types = set(config["block_types"])
+        self.deny_domains = list(config["deny_domains"])
+        self.allow_domains = list(config["allow_domains"])
+        self.block_third_party = config["block_third_party"]
+        self.avg_bytes = {**DEFAULT_CONFIG["avg_bytes"], **config.get("avg_bytes", {})}
+        self._stats: Dict[int, Dict] = {}
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "ResourcePolicy":
+        """
+        Load a policy from JSON (defaults to resource_policy.json next to this script,
+        falling back to DEFAULT_CONFIG if that file doesn't exist)
+        """
+        path = Path(path) if path else DEFAULT_CONFIG_FILE
+        if path.exists():
+            return cls(json.loads(path.read_text(encoding="utf-8")))
+        return cls()
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        host = urlparse(url).hostname or ""
+        if _host_matches(host, self.deny_domains):
+            return True
+        if resource_type in self.block_types:
+            return True
+        if self.block_third_party and resource_type != "document" and not _host_matches(host, self.allow_domains):
+            return True
+        return False
+
+    # ----- stats -----
+    def _page_stats(self, page) -> Dict:
+        key = id(page)
+        if key not in self._stats:
+            self._stats[key] = {"blocked": {}, "allowed": 0, "allowed_bytes": 0, "started": time.perf_counter()}
+        return self._stats[key]
+
+    def _on_request(self, page, url: str, resource_type: str) -> bool:
+        stats = self._page_stats(page)
+        if self.should_block(url, resource_type):
+            stats["blocked"][resource_type] = stats["blocked"].get(resource_type, 0) + 1
+            return True
+        stats["allowed"] += 1
+        return False
+
+    def _on_response(self, page, headers: Dict) -> None:
+        length = headers.get("content-length")
+        if length and length.isdigit():
+            self._page_stats(page)["allowed_bytes"] += int(length)
+
+    def reset(self, page) -> None:
+        """
+        Start a fresh stats window for this page (call before each goto)
+        """
+        self._stats.pop(id(page), None)
+        self._page_stats(page)
+
+    def page_stats(self, page) -> Dict:
+        """
+        Blocked counts, estimated bytes saved and estimated ms saved for this page.
+        ms saved assumes blocked bytes would have arrived at the same rate as the
+        allowed ones.
+        """
+        stats = self._page_stats(page)
+        elapsed = time.perf_counter() - stats["started"]
+        saved_bytes = sum(n * self.avg_bytes.get(t, self.avg_bytes["other"]) for t, n in stats["blocked"].items())
+        rate = stats["allowed_bytes"] / elapsed if elapsed > 0 and stats["allowed_bytes"] else 0
+        return {
+            "blocked": sum(stats["blocked"].values()),
+            "blocked_by_type": dict(stats["blocked"]),
+            "allowed": stats["allowed"],
+            "allowed_bytes": stats["allowed_bytes"],
+            "saved_bytes_est": saved_bytes,
+            "saved_ms_est": saved_bytes / rate * 1000 if rate else 0.0,
+        }
+
+    def report(self, page) -> str:
+        s = self.page_stats(page)
+        return (f"🚫 Blocked {s['blocked']} requests, allowed {s['allowed']} "
+                f"(~{s['saved_bytes_est'] / 1e6:.1f} MB / ~{s['saved_ms_est']:.0f} ms saved)")
+
+    # ----- installation -----
+    def install(self, page) -> None:
+        """
+        Route every request of a sync Playwright page through the policy
+        """
+        def handle(route, request):
+            if self._on_request(page, request.url, request.resource_type):
+                route.abort()
+            else:
+                route.continue_()
+
+        self.reset(page)
+        page.route("**/*", handle)
+        page.on("response", lambda response: self._on_response(page, response.headers))
+
+    async def install_async(self, page) -> None:
+        """
+        Route every request of an async Playwright page through the policy
+        """
+        async def handle(route, request):
+            if self._on_request(page, request.url, request.resource_type):
+                await route.abort()
+            else:
+                await route.continue_()
+
+        self.reset(page)
+        await page.route("**/*", handle)
+        page.on("response", lambda response: self._on_response(page, response.headers))
+
+
+def measure(url: str, policy: ResourcePolicy) -> None:
+    """
+    Load `url` once without and once with the policy and print bytes/ms saved
+    """
+    from playwright.sync_api import sync_playwright
+
+    from scrape_with_playwright import USER_AGENT
+
+    results = {}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        for label, use_policy in (("no policy", False), ("policy", True)):
+            context = browser.new_context(user_agent=USER_AGENT)
+            page = context.new_page()
+            received = {"bytes": 0, "requests": 0}
+
+            def count(response, received=received):
+                length = response.headers.get("content-length")
+                received["requests"] += 1
+                if length and length.isdigit():
+                    received["bytes"] += int(length)
+
+            page.on("response", count)
+            if use_policy:
+                policy.install(page)
+            start = time.perf_counter()
+            page.goto(url, wait_until="load", timeout=60000)
+            results[label] = (received["bytes"], received["requests"], (time.perf_counter() - start) * 1000)
+            context.close()
+        browser.close()
+
+    for label, (n_bytes, n_requests, ms) in results.items():
+        print(f"  {label:<10} {n_requests:4d} responses  {n_bytes / 1e6:6.2f} MB  {ms:7.0f} ms")
+    (b0, _, ms0), (b1, _, ms1) = results["no policy"], results["policy"]
+    print(f"  saved      {(b0 - b1) / 1e6:6.2f} MB  {ms0 - ms1:7.0f} ms per page")
+
+
+def main():
+    from scrape_with_playwright import build_search_url
+
+    parser = argparse.ArgumentParser(description="Measure what the resource policy saves on one results page.")
+    parser.add_argument("--config", type=str, default="", help=f"Policy JSON (default: {DEFAULT_CONFIG_FILE.name})")
+    parser.add_argument("--measure", action="store_true", help="Load a results page with and without the policy")
+    parser.add_argument("--url", type=str, default="", help="Page to measure (default: page 1 of the default query)")
+    args = parser.parse_args()
+
+    policy = ResourcePolicy.load(Path(args.config) if args.config else None)
+    if args.measure:
+        measure(args.url or build_search_url(1), policy)
+    else:
+        print(json.dumps({"block_types": sorted(policy.block_types), "deny_domains": policy.deny_domains,
+                          "allow_domains": policy.allow_domains, "block_third_party": policy.block_third_party},
+                         indent=2))
+
+
+if __name__ == "__main__":
+    main()
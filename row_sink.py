@@ -0,0 +1,176 @@
+"""
+Streaming row sinks: the crawler pushes each page's rows as soon as it is parsed
+and the sink writes them out in batches, so memory stays flat on deep crawls and
+the output file fills in while the crawl is still running.
+
+Rows are buffered and written once batch_size rows are waiting or flush_interval
+seconds have passed since the last write, whichever comes first.
+
+  CsvSink      one CSV, header from the first row, flushed after every batch
+  SqliteSink   a "listings" table (WAL mode, so it can be queried mid-crawl),
+               committed after every batch; duplicate Links are ignored
+  ParquetSink  a directory of part files, one per batch (pd.read_parquet(dir)
+               reads whatever is there so far); needs pyarrow
+
+open_sink() picks one from the output path's extension.
+"""
+
+import abc
+import csv
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+HEAD_SIZE = 5
+
+
+class RowSink(abc.ABC):
+    """
+    Buffers rows and hands them to _write_batch() in batches
+    """
+
+    def __init__(self, path, batch_size: int = 500, flush_interval: float = 5.0):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.page_counts: Dict[int, int] = {}
+        self.head: List[Dict] = []  # first few rows, for summaries
+        self._buffer: List[Dict] = []
+        self._last_flush = time.monotonic()
+
+    def write(self, rows: Iterable[Dict]) -> None:
+        for row in rows:
+            self._buffer.append(row)
+            if len(self.head) < HEAD_SIZE:
+                self.head.append(row)
+            page = row.get('Page')
+            self.page_counts[page] = self.page_counts.get(page, 0) + 1
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+
+    @abc.abstractmethod
+    def _write_batch(self, rows: List[Dict]) -> None:
+        """
+        Write one batch of rows to the output
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvSink(RowSink):
+    """
+    Columns are fixed by the first row; later extra keys are dropped
+    """
+
+    def __init__(self, path, batch_size: int = 500, flush_interval: float = 5.0, append: bool = False):
+        super().__init__(path, batch_size, flush_interval)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._need_header = not (append and self.path.exists() and self.path.stat().st_size > 0)
+        self._file = open(self.path, "a" if append else "w", newline="", encoding="utf-8")
+        self._writer: Optional[csv.DictWriter] = None
+
+    def _write_batch(self, rows: List[Dict]) -> None:
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0].keys()), extrasaction="ignore")
+            if self._need_header:
+                self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self) -> None:
+        super().close()
+        self._file.close()
+
+
+class SqliteSink(RowSink):
+    """
+    Columns are fixed by the first row (Page as INTEGER, the rest TEXT)
+    """
+
+    def __init__(self, path, batch_size: int = 500, flush_interval: float = 5.0, table: str = "listings"):
+        super().__init__(path, batch_size, flush_interval)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self._columns: Optional[List[str]] = None
+
+    def _create_table(self, columns: List[str]) -> None:
+        defs = [f'"{c}" INTEGER' if c == 'Page' else f'"{c}" TEXT' for c in columns]
+        if 'Link' in columns:
+            defs.append('UNIQUE ("Link")')
+        self.db.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({", ".join(defs)})')
+        self._columns = columns
+
+    def _write_batch(self, rows: List[Dict]) -> None:
+        if self._columns is None:
+            self._create_table(list(rows[0].keys()))
+        cols = ", ".join(f'"{c}"' for c in self._columns)
+        marks = ", ".join("?" for _ in self._columns)
+        self.db.executemany(
+            f'INSERT OR IGNORE INTO "{self.table}" ({cols}) VALUES ({marks})',
+            [tuple(row.get(c) for c in self._columns) for row in rows],
+        )
+        self.db.commit()
+
+    def close(self) -> None:
+        super().close()
+        self.db.close()
+
+
+class ParquetSink(RowSink):
+    """
+    One part-NNNNN.parquet file per batch under the `path` directory
+    """
+
+    def __init__(self, path, batch_size: int = 2000, flush_interval: float = 30.0):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("ParquetSink needs pyarrow (pip install pyarrow)") from e
+        super().__init__(path, batch_size, flush_interval)
+        self._pa, self._pq = pa, pq
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._schema = None
+        self._part = len(list(self.path.glob("part-*.parquet")))
+
+    def _write_batch(self, rows: List[Dict]) -> None:
+        if self._schema is None:
+            self._schema = self._pa.schema([
+                (c, self._pa.int64() if c == 'Page' else self._pa.string()) for c in rows[0].keys()
+            ])
+        columns = {name: [row.get(name) for row in rows] for name in self._schema.names}
+        table = self._pa.Table.from_pydict(columns, schema=self._schema)
+        self._pq.write_table(table, self.path / f"part-{self._part:05d}.parquet")
+        self._part += 1
+
+
+def open_sink(path, **kwargs) -> RowSink:
+    """
+    .csv -> CsvSink, .db/.sqlite -> SqliteSink, .parquet -> ParquetSink
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return CsvSink(path, **kwargs)
+    if suffix in (".db", ".sqlite", ".sqlite3"):
+        return SqliteSink(path, **kwargs)
+    if suffix == ".parquet":
+        return ParquetSink(path, **kwargs)
+    raise ValueError(f"Don't know how to write {path} (use .csv, .sqlite or .parquet)")
@@ -5,24 +5,56 @@ Parse a saved eBay search results HTML file (no live requests).
   placed in the same directory as this script, OR pass a filename:
     python scrap_from_file.py --file "iPhone 15 Pro Max for sale _ eBay.html"
 
-- Extracts: Title, Price, Link, Image Link
+- Extracts: Title, Price, Link, Image Link (s-item or s-card result layouts)
 - Saves CSV next to the script.
 
+- --parser lxml / selectolax swaps in a faster HTML parser (see parser_backends.py)
+
+- Batch mode parses a whole directory (or glob) of saved pages across a process
+  pool and writes one merged CSV, deduplicated by listing link:
+    python scrap.py --batch saved_pages/
+    python scrap.py --batch "archive/2025-*/*.html" --parsers 8
+
 Setup:
   pip install beautifulsoup4 pandas
 """
 
 import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Optional
 import pandas as pd
-from bs4 import BeautifulSoup
+
+from failure_artifacts import ArtifactStore
+from layout_plans import extract_items
+from parser_backends import BACKENDS, DEFAULT_BACKEND
 
 # -----------------------------
 # Config defaults
 # -----------------------------
 DEFAULT_BASENAME = "iPhone 15 Pro Max for sale _ eBay"
 OUTPUT_CSV = "ebay_iphone15promax_from_saved_html.csv"
+BATCH_OUTPUT_CSV = "ebay_saved_pages_batch.csv"
+
+# Interstitials are small pages; on a results page the text would sit near the top
+CHALLENGE_SCAN_CHARS = 64 * 1024
+CHALLENGE_NEEDLES = [
+    "checking your browser before you access",
+    "attention required",
+    "enable javascript and cookies",
+    "verify you are a human",
+]
+# One pass for all needles; words may be split by tags or line breaks
+CHALLENGE_RE = re.compile(
+    "|".join(r"\s+".join(map(re.escape, n.split())) for n in CHALLENGE_NEEDLES),
+    re.IGNORECASE,
+)
+NON_TEXT_RE = re.compile(r"<(script|style)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r"<[^>]*>")
 
 
 def find_local_file(basename: str) -> Optional[Path]:
@@ -50,73 +82,95 @@ def is_challenge(html: str) -> bool:
     """
     Detect common interstitial/challenge text (shouldn't happen in a saved results page,
     but useful if the file saved an interstitial by mistake).
+    Only the first CHALLENGE_SCAN_CHARS are scanned, without building a tree.
     """
-    txt = BeautifulSoup(html, "html.parser").get_text(" ", strip=True).lower()
-    needles = [
-        "checking your browser before you access",
-        "attention required",
-        "enable javascript and cookies",
-        "verify you are a human",
-    ]
-    return any(n in txt for n in needles)
+    head = NON_TEXT_RE.sub(" ", html[:CHALLENGE_SCAN_CHARS])
+    return CHALLENGE_RE.search(TAG_RE.sub(" ", head)) is not None
 
 
-def parse_items(html: str) -> List[Dict[str, Optional[str]]]:
+def parse_items(html: str, backend: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
     """
     Parse listing cards from eBay search HTML.
-    Robust selectors to survive layout variants.
+    Handles both the s-item and the newer s-card layout; the page's layout is
+    fingerprinted and later pages of the same layout reuse its selector plan
+    (see layout_plans.py).
     """
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Preferred: <li class="s-item"> nodes that actually contain a product link
-    nodes = soup.select("li.s-item:has(a.s-item__link)")
-    if not nodes:
-        # Common wrapper variant
-        nodes = soup.select("div.s-item__wrapper.clearfix")
-    if not nodes:
-        # Very generic fallback
-        nodes = [c for c in soup.select(".s-item") if c.select_one(".s-item__title")]
-
-    items: List[Dict[str, Optional[str]]] = []
-    for node in nodes:
-        title_el = (
-            node.select_one(".s-item__title") or
-            node.select_one("[data-testid='item-title']") or
-            node.select_one("h3")
-        )
-        link_el = (
-            node.select_one("a.s-item__link") or
-            node.select_one("a[href*='/itm/']")
-        )
-        price_el = (
-            node.select_one(".s-item__price") or
-            node.select_one("[data-testid='item-price']")
-        )
-        img_el = (
-            node.select_one("img.s-item__image-img") or
-            node.select_one(".s-item__image-wrapper img") or
-            node.select_one("img")
-        )
+    return extract_items(html, backend)
 
-        if not (title_el and link_el):
-            continue
-
-        title = title_el.get_text(strip=True)
-        href = (link_el.get("href") or "").split("?")[0]
-        price = price_el.get_text(strip=True) if price_el else None
-        image_url = None
-        if img_el:
-            image_url = img_el.get("src") or img_el.get("data-src") or img_el.get("data-image-src")
-
-        items.append(
-            {
-                "Title": title,
-                "Price": price,
-                "Link": href,
-                "Image Link": image_url,
-            }
-        )
-    return items
+
+def saved_pages(target: str) -> List[Path]:
+    """
+    Files for --batch: every .htm/.html file in a directory, or whatever a glob matches.
+    """
+    path = Path(target).expanduser()
+    if path.is_dir():
+        files = [p for p in path.iterdir() if p.is_file() and p.suffix.lower() in (".htm", ".html")]
+    else:
+        files = [Path(p) for p in glob.glob(str(path), recursive=True) if Path(p).is_file()]
+    return sorted(p.resolve() for p in files)
+
+
+def parse_saved_file(path: str, backend: Optional[str] = None) -> Dict:
+    """
+    Batch worker: parse one saved page -> {file, items, seconds, error}.
+    Runs in a pool process, so each process keeps its own layout plan cache.
+    """
+    start = time.perf_counter()
+    html = Path(path).read_text(encoding="utf-8", errors="ignore")
+    if is_challenge(html):
+        return {"file": path, "items": [], "seconds": time.perf_counter() - start, "error": "challenge page"}
+    items = parse_items(html, backend)
+    return {"file": path, "items": items, "seconds": time.perf_counter() - start, "error": None}
+
+
+def run_batch(target: str, out: str, backend: Optional[str] = None, parsers: int = 0) -> int:
+    """
+    Parse every saved page in `target` across `parsers` processes (default: CPU count)
+    and write the merged, deduplicated rows to `out`. Returns the number of rows saved.
+    """
+    files = saved_pages(target)
+    if not files:
+        raise FileNotFoundError(f"No saved pages found for: {target}")
+    parsers = min(parsers or os.cpu_count() or 1, len(files))
+    print(f"Parsing {len(files)} saved pages with {parsers} processes...")
+
+    results: Dict[str, Dict] = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=parsers) as pool:
+        futures = {pool.submit(parse_saved_file, str(p), backend): p for p in files}
+        for future in as_completed(futures):
+            path = str(futures[future])
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                results[path] = {"file": path, "items": [], "seconds": 0.0, "error": str(e)}
+    wall = time.perf_counter() - start
+
+    # Merge in file order so the first copy of a listing wins
+    rows, seen, duplicates = [], set(), 0
+    for p in files:
+        result = results[str(p)]
+        note = f"  ⚠️ {result['error']}" if result["error"] else ""
+        print(f"  {p.name:<60} {len(result['items']):5d} items {result['seconds'] * 1000:8.0f} ms{note}")
+        for item in result["items"]:
+            key = item["Link"] or (item["Title"], item["Price"])
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            rows.append({**item, "Source File": p.name})
+
+    parse_time = sum(r["seconds"] for r in results.values())
+    failed = sum(1 for r in results.values() if r["error"])
+    print(f"\n✓ {len(files)} files ({failed} failed), {len(rows) + duplicates} items, "
+          f"{duplicates} duplicates dropped")
+    print(f"✓ {parse_time:.1f}s of parsing in {wall:.1f}s wall time ({parse_time / wall:.1f}x)")
+
+    columns = ["Title", "Price", "Link", "Image Link", "Source File"]
+    out_path = Path(out).resolve()
+    pd.DataFrame(rows, columns=columns).to_csv(out_path, index=False)
+    print(f"Saved CSV: {out_path}")
+    return len(rows)
 
 
 def main():
@@ -133,11 +187,35 @@ def main():
         "--out",
         "-o",
         type=str,
-        default=OUTPUT_CSV,
-        help=f"Output CSV filename (default: {OUTPUT_CSV})"
+        default=None,
+        help=f"Output CSV filename (default: {OUTPUT_CSV}, or {BATCH_OUTPUT_CSV} with --batch)"
+    )
+    parser.add_argument(
+        "--parser",
+        "-p",
+        choices=list(BACKENDS),
+        default=DEFAULT_BACKEND,
+        help=f"HTML parser backend (default: {DEFAULT_BACKEND})"
+    )
+    parser.add_argument(
+        "--batch",
+        "-b",
+        type=str,
+        default="",
+        help="Directory or glob of saved pages to parse in parallel into one merged CSV"
+    )
+    parser.add_argument(
+        "--parsers",
+        type=int,
+        default=0,
+        help="--batch: parser processes (default: CPU count)"
     )
     args = parser.parse_args()
 
+    if args.batch:
+        run_batch(args.batch, args.out or BATCH_OUTPUT_CSV, args.parser, args.parsers)
+        return
+
     # Resolve input file
     if args.file:
         src = Path(args.file).expanduser().resolve()
@@ -161,18 +239,19 @@ def main():
             "Open it in a browser to verify, then save the actual results page."
         )
 
-    items = parse_items(html)
+    items = parse_items(html, args.parser)
     print(f"Parsed {len(items)} items.")
 
     if not items:
-        # Save a copy for inspection
-        debug_copy = src.with_name("debug_saved_page.html")
-        debug_copy.write_text(html, encoding="utf-8", errors="ignore")
-        print(f"No items parsed. Wrote debug copy to: {debug_copy}")
+        # Keep a compressed copy for inspection
+        artifacts = ArtifactStore()
+        artifacts.capture("no_items", src.as_uri(), html=html)
+        artifacts.close()
+        print(f"No items parsed. {artifacts.report()}")
         return
 
     df = pd.DataFrame(items)
-    out_path = Path(args.out).resolve()
+    out_path = Path(args.out or OUTPUT_CSV).resolve()
     df.to_csv(out_path, index=False)
     print(f"Saved CSV: {out_path}")
 
@@ -2,34 +2,171 @@
 Scrape eBay search results using Playwright (handles dynamic JavaScript content)
 """
 from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
-import pandas as pd
+import os
 import time
-import random
+from urllib.parse import quote_plus
 
-def scrape_ebay_with_playwright(max_pages=3):
+from browser_profile import context_options, launch_args
+from checkpoint import CrawlJournal
+from failure_artifacts import ArtifactStore
+from html_cache import HtmlCache
+from page_readiness import AdaptiveDelay, wait_until_ready
+from parser_backends import get_backend, has_next_link, listing_rows, parse_results
+from resource_policy import ResourcePolicy
+from row_sink import open_sink
+from timing import Trace
+
+BASE_URL = "https://www.ebay.com/sch/i.html"
+DEFAULT_QUERY = "Samsung Galaxy S22"
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Sold + completed, used/refurbished conditions, unlocked phones, 240 per page
+DEFAULT_PARAMS = [
+    "_sacat=0",
+    "_from=R40",
+    "LH_Sold=1",
+    "LH_Complete=1",
+    "rt=nc",
+    "LH_ItemCondition=2010|2020|2030",
+    "Network=Unlocked",
+    "_dcat=9355",
+    "_ipg=240",
+]
+
+
+def build_search_url(page_num, query=DEFAULT_QUERY, params=None):
+    """
+    Build the eBay search URL for one results page
+    params: Extra URL params (default: DEFAULT_PARAMS)
+    Set EBAY_BASE_URL to point every crawler at another host (e.g. replay_server.py)
+    """
+    params = DEFAULT_PARAMS if params is None else params
+    parts = [f"_nkw={quote_plus(query)}", *params, f"_pgn={page_num}"]
+    return f"{os.environ.get('EBAY_BASE_URL', BASE_URL)}?{'&'.join(parts)}"
+
+
+def extract_page_items(soup, page_num):
+    """
+    Extract listing rows from a parsed results page
+    Returns the rows, or None when there is no results list
+    """
+    # Find results using the working selector from final_scraper.py
+    results_list = soup.find('ul', {'class': 'srp-results'})
+    if not results_list:
+        return None
+
+    items = results_list.find_all('li')
+    print(f"Found {len(items)} total items on page")
+
+    page_items = []
+    for item in items:
+        try:
+            # Extract title from heading (the working method!)
+            title_elem = item.find('div', {'role': 'heading'})
+            if not title_elem:
+                continue
+            title = title_elem.get_text(strip=True).replace('Opens in a new window or tab', '').strip()
+
+            if not title or len(title) < 10:
+                continue
+
+            # Extract price
+            price_elem = item.find('span', class_='s-card__price')
+            price = price_elem.get_text(strip=True) if price_elem else 'N/A'
+
+            # Extract sold date
+            sold_date = 'N/A'
+            # Look for sold date in various possible locations
+            sold_date_elem = (
+                item.find('span', class_='POSITIVE') or  # Common class for sold date
+                item.find('span', string=lambda x: x and 'Sold' in x if x else False) or
+                item.find('span', class_=lambda x: x and 'sold' in ' '.join(x).lower() if x else False)
+            )
+            if sold_date_elem:
+                sold_date = sold_date_elem.get_text(strip=True)
+
+            # Extract link
+            link_elem = item.find('a', href=lambda x: x and '/itm/' in x if x else False)
+            if not link_elem:
+                continue
+            link = link_elem.get('href', '').split('?')[0]
+
+            # Extract image
+            img_elem = item.find('img')
+            image_url = img_elem.get('src', 'N/A') if img_elem else 'N/A'
+
+            page_items.append({
+                'Page': page_num,
+                'Title': title,
+                'Price': price,
+                'Sold Date': sold_date,
+                'Link': link,
+                'Image Link': image_url
+            })
+
+        except Exception as e:
+            continue
+
+    return page_items
+
+
+def has_next_page(soup):
+    """
+    True when the pagination bar has an enabled "next" link
+    """
+    next_button = soup.find('a', class_='pagination__next')
+    return bool(next_button) and 'pagination__next--disabled' not in ' '.join(next_button.get('class', []))
+
+
+def scrape_ebay_with_playwright(max_pages=3, block_resources=True, use_cache=True, checkpoint=True, sink=None,
+                                trace=True, headless=True, low_footprint=True, capture_failures=True,
+                                parser=None):
     """
     Scrape multiple pages of eBay results
     max_pages: Number of pages to scrape (default: 3)
+    block_resources: Skip images/fonts/CSS/trackers per resource_policy.json (default: True)
+    use_cache: Store every page in html_cache/ and reuse fresh copies (default: True)
+    checkpoint: Save rows as each page finishes and resume an interrupted run (default: True)
+    sink: RowSink to stream rows into page by page; rows are then not kept in memory
+          and the returned list is empty (default: None, return every row)
+    trace: Write per-page timing spans to traces/ and print a per-stage summary (default: True)
+    headless: Hide the browser window (default: True)
+    low_footprint: Small viewport and trimmed Chromium features, see browser_profile.py (default: True)
+    capture_failures: Keep sampled HTML/screenshots of failed pages in failure_artifacts/ (default: True)
+    parser: HTML parser backend - html.parser, lxml or selectolax, see parser_backends.py
+            (default: None, html.parser)
     """
+    backend = get_backend(parser)
+    cache = HtmlCache() if use_cache else None
+    journal = CrawlJournal("scrape_with_playwright") if checkpoint else None
+    partial = journal.partial_path("scrape_with_playwright") if journal else None
+    artifacts = ArtifactStore() if capture_failures else None
     with sync_playwright() as p:
         # Launch browser with anti-detection settings
         print("Launching browser...")
         browser = p.chromium.launch(
-            headless=False,  # Set to True to hide browser
-            args=['--disable-blink-features=AutomationControlled']
+            headless=headless,
+            args=launch_args(low_footprint)
         )
         
-        context = browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        )
+        context = browser.new_context(**context_options(low_footprint))
         page = context.new_page()
-        
-        # Build search URL base
-        base_url = "https://www.ebay.com/sch/i.html"
+        policy = ResourcePolicy.load() if block_resources else None
+        if policy:
+            policy.install(page)
         
         all_items = []
+        resumed = journal.load_rows(partial) if journal else []
+        if resumed:
+            print(f"Resuming: {len(resumed)} items already saved by an interrupted run")
+        if sink is not None:
+            sink.write(resumed)
+        else:
+            all_items.extend(resumed)
+        total_items = len(resumed)
+        adaptive = AdaptiveDelay()
+        tracer = Trace("scrape_with_playwright") if trace else None
+        failed = False
         
         # Loop through pages
         for page_num in range(1, max_pages + 1):
@@ -38,42 +175,62 @@ def scrape_ebay_with_playwright(max_pages=3):
             print(f"{'='*60}")
             
             # Build URL with page number
-            params = [
-                "_nkw=Samsung+Galaxy+S22",
-                "_sacat=0",
-                "_from=R40",
-                "LH_Sold=1",
-                "LH_Complete=1",
-                "rt=nc",
-                "LH_ItemCondition=2010|2020|2030",
-                "Network=Unlocked",
-                "_dcat=9355",
-                "_ipg=240",
-                f"_pgn={page_num}"
-            ]
-            search_url = f"{base_url}?{'&'.join(params)}"
+            search_url = build_search_url(page_num)
+            done = journal.page_entry(search_url) if journal else None
+            if done:
+                print(f"✓ Page {page_num} already done ({done['rows']} items)")
+                if done['last']:
+                    break
+                continue
+            cache_start = time.perf_counter()
+            cached_html = cache.get(search_url) if cache else None
+            if tracer and cached_html is not None:
+                tracer.record(page_num, "cache", time.perf_counter() - cache_start,
+                              html_bytes=len(cached_html.encode('utf-8')))
             
+            html_content = None
             try:
-                print(f"Navigating to page {page_num}...")
-                page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+                if cached_html is not None:
+                    print(f"✓ Using cached copy of page {page_num}")
+                    html_content = cached_html
+                else:
+                    print(f"Navigating to page {page_num}...")
+                    if policy:
+                        policy.reset(page)
+                    nav_start = time.perf_counter()
+                    response = page.goto(search_url, wait_until="domcontentloaded", timeout=60000)
+                    nav_time = time.perf_counter() - nav_start
                 
-                # Wait for results to load
-                print("Waiting for results...")
-                time.sleep(3)
+                    # Wait for results to load (returns as soon as cards are in the DOM)
+                    print("Waiting for results...")
+                    ready = wait_until_ready(page, response)
+                    adaptive.record(time.perf_counter() - nav_start, ok=ready['state'] == 'results')
+                    if tracer:
+                        transfer = (policy.page_stats(page)['allowed_bytes'] if policy
+                                    else int((response.headers.get('content-length') if response else None) or 0))
+                        tracer.record(page_num, "navigation", nav_time, status=ready['status'],
+                                      transfer_bytes=transfer)
+                        tracer.record(page_num, "selector_wait", ready['wait'], state=ready['state'])
                 
-                try:
-                    page.wait_for_selector("ul.srp-results", timeout=15000)
-                    print("✓ Results loaded")
-                except:
-                    print("⚠️ Could not find results. Saving debug files...")
-                    page.screenshot(path=f"debug_page_{page_num}.png")
-                    with open(f"debug_page_{page_num}.html", "w", encoding="utf-8") as f:
-                        f.write(page.content())
-                    print(f"   Saved: debug_page_{page_num}.png and debug_page_{page_num}.html")
-                    break
+                    if ready['state'] == 'results':
+                        print(f"✓ Results loaded in {ready['wait']:.2f}s")
+                    else:
+                        print(f"⚠️ Could not find results ({ready['state']})")
+                        if artifacts:
+                            artifacts.capture(f"not_ready_{ready['state']}", search_url, html=page.content,
+                                              screenshot=lambda: page.screenshot(type='jpeg', quality=60),
+                                              page=page_num, status=ready['status'])
+                        failed = True
+                        break
                 
-                # Get page content
-                html_content = page.content()
+                    # Get page content
+                    content_start = time.perf_counter()
+                    html_content = page.content()
+                    if tracer:
+                        tracer.record(page_num, "content", time.perf_counter() - content_start,
+                                      html_bytes=len(html_content.encode('utf-8')))
+                    if cache:
+                        cache.put(search_url, html_content)
                 
                 # Save first page for inspection
                 if page_num == 1:
@@ -81,121 +238,107 @@ def scrape_ebay_with_playwright(max_pages=3):
                         f.write(html_content)
                     print("✓ Saved first page to playwright_rendered.html")
                 
-                # Parse with BeautifulSoup
-                soup = BeautifulSoup(html_content, 'html.parser')
-                
-                # Find results using the working selector from final_scraper.py
-                results_list = soup.find('ul', {'class': 'srp-results'})
-                if not results_list:
+                # Parse just the results list, once, with the chosen backend
+                parse_start = time.perf_counter()
+                tree = parse_results(backend, html_content)
+                extract_start = time.perf_counter()
+                cards = backend.cards(tree)
+                page_items = listing_rows(cards, page_num)
+                more_pages = has_next_link(html_content)
+                if tracer:
+                    tracer.record(page_num, "parse", extract_start - parse_start)
+                    tracer.record(page_num, "extract", time.perf_counter() - extract_start,
+                                  items=len(page_items or []))
+                if page_items is None:
                     print("❌ No results list found")
+                    if artifacts:
+                        artifacts.capture("no_results_list", search_url, html=html_content, page=page_num)
+                    failed = True
                     break
+                print(f"Found {len(cards)} total items on page")
+                if sink is not None:
+                    sink.write(page_items)
+                else:
+                    all_items.extend(page_items)
+                total_items += len(page_items)
+                if journal:
+                    journal.record_page(search_url, page_items, partial, last=not more_pages)
                 
-                items = results_list.find_all('li')
-                print(f"Found {len(items)} total items on page")
-                
-                # Extract data
-                page_items = 0
-                for item in items:
-                    try:
-                        # Extract title from heading (the working method!)
-                        title_elem = item.find('div', {'role': 'heading'})
-                        if not title_elem:
-                            continue
-                        title = title_elem.get_text(strip=True).replace('Opens in a new window or tab', '').strip()
-                        
-                        if not title or len(title) < 10:
-                            continue
-                        
-                        # Extract price
-                        price_elem = item.find('span', class_='s-card__price')
-                        price = price_elem.get_text(strip=True) if price_elem else 'N/A'
-                        
-                        # Extract sold date
-                        sold_date = 'N/A'
-                        # Look for sold date in various possible locations
-                        sold_date_elem = (
-                            item.find('span', class_='POSITIVE') or  # Common class for sold date
-                            item.find('span', string=lambda x: x and 'Sold' in x if x else False) or
-                            item.find('span', class_=lambda x: x and 'sold' in ' '.join(x).lower() if x else False)
-                        )
-                        if sold_date_elem:
-                            sold_date = sold_date_elem.get_text(strip=True)
-                        
-                        # Extract link
-                        link_elem = item.find('a', href=lambda x: x and '/itm/' in x if x else False)
-                        if not link_elem:
-                            continue
-                        link = link_elem.get('href', '').split('?')[0]
-                        
-                        # Extract image
-                        img_elem = item.find('img')
-                        image_url = img_elem.get('src', 'N/A') if img_elem else 'N/A'
-                        
-                        all_items.append({
-                            'Page': page_num,
-                            'Title': title,
-                            'Price': price,
-                            'Sold Date': sold_date,
-                            'Link': link,
-                            'Image Link': image_url
-                        })
-                        page_items += 1
-                        
-                    except Exception as e:
-                        continue
-                
-                print(f"✓ Extracted {page_items} items from page {page_num}")
-                print(f"✓ Total items so far: {len(all_items)}")
+                print(f"✓ Extracted {len(page_items)} items from page {page_num}")
+                print(f"✓ Total items so far: {total_items}")
+                if policy and cached_html is None:
+                    print(policy.report(page))
                 
                 # Check for next page
                 if page_num < max_pages:
-                    next_button = soup.find('a', class_='pagination__next')
-                    if not next_button or 'pagination__next--disabled' in ' '.join(next_button.get('class', [])):
+                    if not more_pages:
                         print("\n✓ Reached last page!")
                         break
                     
-                    delay = random.uniform(3, 6)
-                    print(f"⏳ Waiting {delay:.1f} seconds before next page...")
-                    time.sleep(delay)
+                    if cached_html is None:
+                        delay = adaptive.sleep()
+                        if tracer:
+                            tracer.record(page_num, "sleep", delay)
+                        print(f"⏳ Waited {delay:.1f} seconds before next page")
                     
             except Exception as e:
                 print(f"❌ Error on page {page_num}: {e}")
+                if artifacts:
+                    # A cached page never reached the tab, which still shows an earlier page
+                    artifacts.capture("exception", search_url,
+                                      html=html_content if html_content is not None else page.content,
+                                      page=page_num, error=str(e))
+                failed = True
                 break
         
         # Close browser
         browser.close()
+        if artifacts:
+            artifacts.close()
+            if artifacts.stats['captured']:
+                print(artifacts.report())
+        if sink is not None:
+            sink.flush()
+        if cache:
+            cache.close()
+        if journal and not failed:
+            journal.clear()
+        elif journal:
+            print(f"\n⚠️ Stopped early - rerun to resume from checkpoint {journal.path.name}")
+        
+        # Report where the time went (per-page spans are in the trace file)
+        if tracer:
+            tracer.close()
+            if tracer.spans:
+                print(f"\n{tracer.report()}")
         return all_items
 
 if __name__ == "__main__":
     print("Starting eBay Multi-Page Scraper with Playwright...\n")
     
-    # Scrape 3 pages (should get ~500 items with _ipg=240)
-    items = scrape_ebay_with_playwright(max_pages=3)
+    # Scrape 3 pages (should get ~500 items with _ipg=240), streaming rows to the CSV as each page finishes
+    with open_sink('ebay_playwright_results.csv') as sink:
+        scrape_ebay_with_playwright(max_pages=3, sink=sink)
     
-    if items:
+    if sink.rows_written:
         print(f"\n{'='*60}")
         print(f"✅ SCRAPING COMPLETE!")
         print(f"{'='*60}")
-        print(f"Total items scraped: {len(items)}")
-        
-        # Save to CSV
-        df = pd.DataFrame(items)
-        df.to_csv('ebay_playwright_results.csv', index=False)
+        print(f"Total items scraped: {sink.rows_written}")
         print(f"✓ Saved to ebay_playwright_results.csv")
         
         # Show statistics
         print(f"\nItems per page:")
-        for page_num in sorted(df['Page'].unique()):
-            count = len(df[df['Page'] == page_num])
-            print(f"  Page {page_num}: {count} items")
+        for page_num in sorted(sink.page_counts):
+            print(f"  Page {page_num}: {sink.page_counts[page_num]} items")
         
         # Show sample
         print(f"\nFirst 5 items:")
-        for i, item in enumerate(items[:5], 1):
+        for i, item in enumerate(sink.head, 1):
             print(f"\n{i}. {item['Title'][:70]}")
             print(f"   Price: {item['Price']}")
             print(f"   Sold Date: {item['Sold Date']}")
             print(f"   Page: {item['Page']}")
     else:
         print("\n❌ No items scraped")
-        print("Check debug files if created: debug_page_1.png, debug_page_1.html")
\ No newline at end of file
+        print("Check failure artifacts if any were captured: python failure_artifacts.py list")
\ No newline at end of file
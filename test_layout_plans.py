@@ -0,0 +1,64 @@
+"""
+A cached layout plan must not change results: planned parses equal full probing.
+
+Usage:
+  python -m pytest -q test_layout_plans.py
+"""
+
+import pytest
+
+import layout_plans
+from parser_backends import BACKENDS, get_backend, s_item_rows, s_items
+
+
+def page(*cards: str) -> str:
+    return '<html><body><ul class="srp-results">' + "".join(cards) + "</ul></body></html>"
+
+
+def card(n: int, title: str) -> str:
+    return (f'<li class="s-item"><div class="s-item__wrapper clearfix">'
+            f'<a class="s-item__link" href="https://www.ebay.com/itm/{n}?hash=x">{title}</a>'
+            f'<span data-testid="item-price">${n}</span><img src="{n}.jpg"></div></li>')
+
+
+TESTID_CARD = card(1, '<span data-testid="item-title">Testid title one</span><h3>h3 title one</h3>')
+H3_CARD = card(2, "<h3>Only an h3 title</h3>")
+DECOY_CARD = card(3, '<div class="s-item__title">Real title three</div><h3>h3 decoy three</h3>')
+FILLER = [TESTID_CARD] * 300  # pushes later cards past the first 64 KB
+PAGES = [
+    page(TESTID_CARD, H3_CARD),  # title plan: item-title, h3
+    page(TESTID_CARD, DECOY_CARD),  # adds .s-item__title, which outranks both
+    page(H3_CARD, TESTID_CARD),
+    page(DECOY_CARD, H3_CARD, TESTID_CARD),
+    page(*FILLER, H3_CARD),
+    page(*FILLER, DECOY_CARD),  # same first 64 KB as the page before
+]
+
+
+@pytest.fixture(params=list(BACKENDS))
+def backend(request):
+    try:
+        get_backend(request.param)
+    except ImportError as e:
+        pytest.skip(str(e))
+    layout_plans.PLANS.clear()
+    return request.param
+
+
+def probed(html: str, backend: str):
+    parser = get_backend(backend)
+    return s_item_rows(s_items(parser, parser.parse(html)))
+
+
+def test_planned_equals_probed_in_any_order(backend):
+    for pages in (PAGES, PAGES[::-1]):
+        layout_plans.PLANS.clear()
+        for html in pages + pages:  # second pass runs entirely on cached plans
+            assert layout_plans.extract_items(html, backend) == probed(html, backend)
+
+
+@pytest.mark.parametrize("first, later", [(0, 1), (4, 5)])
+def test_higher_priority_selector_wins_over_plan(backend, first, later):
+    layout_plans.extract_items(PAGES[first], backend)
+    titles = [row["Title"] for row in layout_plans.extract_items(PAGES[later], backend)]
+    assert titles[-1] == "Real title three"
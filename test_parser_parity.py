@@ -0,0 +1,57 @@
+"""
+Parity of the fast parse paths with the original BeautifulSoup reference
+(scrape_with_playwright.extract_page_items / has_next_page) on the saved pages.
+
+Usage:
+  python -m pytest -q test_parser_parity.py
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from card_stream import CardStream, iter_cards, read_chunks
+from embedded_json import parse_listings
+from parser_backends import BACKENDS, get_backend, listing_rows, parse_listing_page
+from scrape_with_playwright import extract_page_items, has_next_page
+
+HERE = Path(__file__).resolve().parent
+FIXTURES = ["playwright_rendered.html", "ebay_iphone.html"]
+
+
+@lru_cache(maxsize=None)
+def page(name: str) -> str:
+    return (HERE / name).read_text(encoding="utf-8", errors="ignore")
+
+
+@lru_cache(maxsize=None)
+def reference(name: str):
+    soup = BeautifulSoup(page(name), "html.parser")
+    return extract_page_items(soup, 1), has_next_page(soup)
+
+
+@pytest.mark.parametrize("subtree", [False, True], ids=["document", "subtree"])
+@pytest.mark.parametrize("backend", list(BACKENDS))
+@pytest.mark.parametrize("fixture", FIXTURES)
+def test_backend_matches_reference(fixture, backend, subtree):
+    try:
+        get_backend(backend)
+    except ImportError as e:
+        pytest.skip(str(e))
+    assert parse_listing_page(page(fixture), 1, backend, subtree) == reference(fixture)
+
+
+@pytest.mark.parametrize("chunk_size", [97, 4096, 64 * 1024])
+@pytest.mark.parametrize("fixture", FIXTURES)
+def test_card_stream_matches_reference(fixture, chunk_size):
+    stream = CardStream()
+    cards = list(iter_cards(read_chunks(str(HERE / fixture), chunk_size), stream))
+    rows = listing_rows(cards if stream.found_list else None, 1)
+    assert (rows, stream.has_next) == reference(fixture)
+
+
+@pytest.mark.parametrize("fixture", FIXTURES)
+def test_embedded_json_matches_reference(fixture):
+    assert parse_listings(page(fixture), 1) == reference(fixture)
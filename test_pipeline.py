@@ -0,0 +1,50 @@
+"""
+pipeline.run_pipeline keeps going (or fails fast) when parsing goes wrong, instead of hanging.
+
+Usage:
+  python -m pytest -q test_pipeline.py
+"""
+
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from pipeline import run_pipeline
+
+BAD_PAGE = 2
+
+
+async def fetch(page_num: int) -> str:
+    await asyncio.sleep(0)
+    return f"<html>page {page_num}</html>"
+
+
+def parse_or_raise(html: str, page_num: int):
+    if page_num == BAD_PAGE:
+        raise ValueError("malformed page")
+    return [{"Page": page_num}], True
+
+
+def parse_or_die(html: str, page_num: int):
+    if page_num == BAD_PAGE:
+        os._exit(1)  # takes the worker process down, breaking the pool
+    return [{"Page": page_num}], True
+
+
+def run(parse, parsers: int = 1):
+    pipeline = run_pipeline(fetch, max_pages=8, fetchers=2, parsers=parsers, queue_size=1, parse=parse)
+    return asyncio.run(asyncio.wait_for(pipeline, timeout=60))
+
+
+@pytest.mark.parametrize("parsers", [1, 3])
+def test_parse_error_fails_the_page_and_returns(parsers):
+    rows, stats = run(parse_or_raise, parsers)
+    assert stats["failed"] == [BAD_PAGE]
+    assert rows == [{"Page": 1}]  # cut off before the failed page, no hole
+
+
+def test_broken_pool_raises():
+    with pytest.raises(BrokenProcessPool):
+        run(parse_or_die)
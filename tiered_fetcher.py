@@ -0,0 +1,219 @@
+"""
+Tiered fetching: try a pooled keep-alive HTTP client first, fall back to a
+Playwright render only when the plain response is a challenge page or has no
+ul.srp-results list.
+
+Most results pages are server-rendered, so the cheap tier (milliseconds, a few
+MB) handles them and the browser only starts when something actually needs it.
+Hit rates per tier are printed at the end of a run.
+
+Usage:
+  python tiered_fetcher.py --query "iPhone 15 Pro Max" --pages 5
+"""
+
+import argparse
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from async_scraper import parse_page
+from browser_profile import context_options, launch_args
+from html_cache import HtmlCache
+from page_readiness import AdaptiveDelay, wait_until_ready
+from resource_policy import ResourcePolicy
+from scrap import is_challenge
+from scrape_with_playwright import DEFAULT_QUERY, USER_AGENT, build_search_url
+
+OUTPUT_CSV = "ebay_tiered_results.csv"
+
+# Browser-like headers (same as the requests loop in scrap.ipynb)
+HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+RESULTS_LIST_RE = re.compile(r'<ul[^>]*class="[^"]*\bsrp-results\b')
+
+
+def make_session(pool_size: int = 10) -> requests.Session:
+    """
+    requests.Session with a keep-alive connection pool and light retries
+    """
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=1.0, status_forcelist=(500, 502, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def needs_browser(status: int, html: str) -> Optional[str]:
+    """
+    Why a plain HTTP response can't be used, or None if it's fine
+    """
+    if status != 200:
+        return f"http {status}"
+    if not RESULTS_LIST_RE.search(html):
+        return "no srp-results"
+    if is_challenge(html):
+        return "challenge"
+    return None
+
+
+class TieredFetcher:
+    """
+    fetch(url) -> (html, tier). Fresh cached pages come back as tier "cache".
+    The Playwright tier is launched lazily on the first escalation and reused after that.
+    """
+
+    def __init__(self, pool_size: int = 10, headless: bool = True, block_resources: bool = True,
+                 use_cache: bool = True):
+        self.session = make_session(pool_size)
+        self.cache = HtmlCache() if use_cache else None
+        self.headless = headless
+        self.policy = ResourcePolicy.load() if block_resources else None
+        self.stats: Dict[str, int] = {"cache": 0, "http": 0, "browser": 0, "failed": 0}
+        self.escalations: Dict[str, int] = {}
+        self._playwright = None
+        self._browser = None
+        self._page = None
+
+    def _browser_page(self):
+        if self._page is None:
+            from playwright.sync_api import sync_playwright
+
+            print("Launching browser tier...")
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(
+                headless=self.headless,
+                args=launch_args()
+            )
+            context = self._browser.new_context(**context_options())
+            self._page = context.new_page()
+            if self.policy:
+                self.policy.install(self._page)
+        return self._page
+
+    def _render(self, url: str) -> Optional[str]:
+        page = self._browser_page()
+        if self.policy:
+            self.policy.reset(page)
+        response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        ready = wait_until_ready(page, response)
+        if ready['state'] != 'results':
+            return None
+        return page.content()
+
+    def fetch(self, url: str) -> Tuple[Optional[str], str]:
+        if self.cache is not None:
+            cached_html = self.cache.get(url)
+            if cached_html is not None:
+                self.stats["cache"] += 1
+                return cached_html, "cache"
+
+        try:
+            response = self.session.get(url, timeout=20)
+            reason = needs_browser(response.status_code, response.text)
+            if reason is None:
+                self.stats["http"] += 1
+                if self.cache is not None:
+                    self.cache.put(url, response.text)
+                return response.text, "http"
+        except requests.RequestException as e:
+            reason = type(e).__name__
+        self.escalations[reason] = self.escalations.get(reason, 0) + 1
+
+        try:
+            html = self._render(url)
+        except Exception as e:
+            print(f"❌ Browser tier failed: {e}")
+            html = None
+        if html is None:
+            self.stats["failed"] += 1
+            return None, "failed"
+        self.stats["browser"] += 1
+        if self.cache is not None:
+            self.cache.put(url, html)
+        return html, "browser"
+
+    def report(self) -> str:
+        total = sum(self.stats.values()) or 1
+        lines = [f"  {tier:<8} {n:4d} ({n / total:.0%})" for tier, n in self.stats.items()]
+        if self.escalations:
+            lines.append("  escalated because: " + ", ".join(f"{k} x{v}" for k, v in self.escalations.items()))
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self._browser is not None:
+            self._browser.close()
+            self._playwright.stop()
+
+
+def scrape_ebay_tiered(max_pages: int = 3, query: str = DEFAULT_QUERY, params: Optional[List[str]] = None,
+                       fetcher: Optional[TieredFetcher] = None) -> List[Dict]:
+    """
+    Same page loop and rows as scrape_ebay_with_playwright, fetched through the tiers
+    """
+    own_fetcher = fetcher is None
+    fetcher = fetcher or TieredFetcher()
+    adaptive = AdaptiveDelay()
+    all_items = []
+    try:
+        for page_num in range(1, max_pages + 1):
+            start = time.perf_counter()
+            html, tier = fetcher.fetch(build_search_url(page_num, query, params))
+            adaptive.record(time.perf_counter() - start, ok=html is not None)
+            if html is None:
+                print(f"❌ Could not fetch page {page_num}")
+                break
+            rows, has_next = parse_page(html, page_num)
+            if rows is None:
+                print(f"❌ No results list found on page {page_num}")
+                break
+            all_items.extend(rows)
+            print(f"✓ Page {page_num} via {tier}: {len(rows)} items ({time.perf_counter() - start:.2f}s)")
+            if page_num < max_pages:
+                if not has_next:
+                    print("\n✓ Reached last page!")
+                    break
+                if tier != "cache":
+                    adaptive.sleep()
+    finally:
+        print("\nTier hit rates:")
+        print(fetcher.report())
+        if own_fetcher:
+            fetcher.close()
+    return all_items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape eBay results over plain HTTP, falling back to Playwright.")
+    parser.add_argument("--query", "-q", type=str, default=DEFAULT_QUERY, help=f"Search query (default: {DEFAULT_QUERY})")
+    parser.add_argument("--pages", type=int, default=3, help="Number of pages to scrape (default: 3)")
+    parser.add_argument("--out", "-o", type=str, default=OUTPUT_CSV, help=f"Output CSV (default: {OUTPUT_CSV})")
+    args = parser.parse_args()
+
+    items = scrape_ebay_tiered(args.pages, args.query)
+    if not items:
+        print("\n❌ No items scraped")
+        return
+    pd.DataFrame(items).to_csv(args.out, index=False)
+    print(f"\n✅ Scraped {len(items)} items -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Per-page timing spans for crawls.
+
+Each span is one JSON line: {"run", "page", "stage", "start", "duration", ...attrs},
+where attrs carry things like bytes transferred or items extracted. Stages used
+by the crawler:
+  navigation     page.goto until the document response (transfer_bytes)
+  selector_wait  wait_until_ready until results/challenge
+  content        page.content() (html_bytes)
+  cache          reading a cached copy instead of the three above (html_bytes)
+  parse          building the tree of the results list
+  extract        pulling rows out of the tree (items)
+  sleep          politeness delay before the next page
+
+Spans go to traces/<run>.jsonl as they happen; summary() aggregates
+count/total/p50/p95 per stage for the run.
+
+Usage:
+  python timing.py traces/scrape_with_playwright-20250101-120000.jsonl   # summarize saved runs
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+TRACE_DIR = Path(__file__).resolve().parent / "traces"
+
+STAGE_ORDER = ["navigation", "selector_wait", "content", "cache", "parse", "extract", "sleep"]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile (q in 0..100) of a non-empty list
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def summarize(spans: Iterable[Dict]) -> Dict[str, Dict]:
+    """
+    {stage: {count, total, p50, p95, bytes, items}} over a set of spans
+    """
+    by_stage: Dict[str, List[Dict]] = {}
+    for span in spans:
+        by_stage.setdefault(span["stage"], []).append(span)
+    order = {stage: i for i, stage in enumerate(STAGE_ORDER)}
+    summary = {}
+    for stage in sorted(by_stage, key=lambda s: (order.get(s, len(order)), s)):
+        durations = [s["duration"] for s in by_stage[stage]]
+        summary[stage] = {
+            "count": len(durations),
+            "total": sum(durations),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "bytes": sum(s.get("transfer_bytes", 0) + s.get("html_bytes", 0) for s in by_stage[stage]),
+            "items": sum(s.get("items", 0) for s in by_stage[stage]),
+        }
+    return summary
+
+
+def format_summary(summary: Dict[str, Dict]) -> str:
+    lines = [f"  {'stage':<14} {'n':>4} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'MB':>7} {'items':>6}"]
+    for stage, s in summary.items():
+        lines.append(f"  {stage:<14} {s['count']:>4} {s['total']:>9.2f} {s['p50'] * 1000:>9.0f} "
+                     f"{s['p95'] * 1000:>9.0f} {s['bytes'] / 1e6:>7.1f} {s['items']:>6}")
+    return "\n".join(lines)
+
+
+class Trace:
+    """
+    Span recorder for one crawl run, streaming JSON lines to disk
+    """
+
+    def __init__(self, name: str, root: Path = TRACE_DIR):
+        self.run = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        Path(root).mkdir(parents=True, exist_ok=True)
+        self.path = Path(root) / f"{self.run}.jsonl"
+        self.spans: List[Dict] = []
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def record(self, page: int, stage: str, duration: float, start: Optional[float] = None, **attrs) -> Dict:
+        """
+        Log a span measured elsewhere (start is wall-clock, defaults to now - duration)
+        """
+        span = {
+            "run": self.run,
+            "page": page,
+            "stage": stage,
+            "start": round(start if start is not None else time.time() - duration, 3),
+            "duration": round(duration, 4),
+            **attrs,
+        }
+        self.spans.append(span)
+        self._file.write(json.dumps(span) + "\n")
+        self._file.flush()
+        return span
+
+    def summary(self) -> Dict[str, Dict]:
+        return summarize(self.spans)
+
+    def report(self) -> str:
+        return f"Timing per stage ({self.path.name}):\n{format_summary(self.summary())}"
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def load_spans(path: Path) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    paths = [Path(p) for p in sys.argv[1:]] or sorted(TRACE_DIR.glob("*.jsonl"))[-1:]
+    if not paths:
+        print("❌ No trace files found")
+        return
+    spans = [span for path in paths for span in load_spans(path)]
+    runs = {span["run"] for span in spans}
+    print(f"{len(spans)} spans from {len(runs)} run(s)")
+    print(format_summary(summarize(spans)))
+
+
+if __name__ == "__main__":
+    main()
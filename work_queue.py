@@ -0,0 +1,622 @@
+"""
+Distributed crawl work queue: a job spec is split into (query, page) work units
+on a shared queue, and any number of worker processes - on this machine or
+others - lease units, fetch them in a browser and hand the rows back.
+
+Units are leased with a visibility timeout: a worker that dies mid-page simply
+lets its lease expire and the unit goes back on the queue, while a live worker
+extends the lease every --heartbeat seconds so a slow page isn't leased twice. Failed units are
+retried with exponential backoff; after max_attempts they move to the dead-letter
+list (see `status` / `requeue-dead`). A job's later pages are only leased once its
+page 1 is done: page 1's result count (see pagination.py) tells how many pages the
+query really has, and the units past that are skipped instead of being fetched,
+failing and dead-lettering. Likewise, when a page turns out to be the last one
+(or has no results), the rest of that job's pages are skipped.
+
+The per-host request budget (--rate / --burst) lives in the queue too, so it is
+the total for all workers together, not per worker. Each worker launches its own
+browsers and never attaches to the browser_pool.py service, whose contexts can
+only serve one client. Its profiles live in the first free worker slot on the
+machine (browser_profiles/workers/worker_N, held with a lock file while the
+worker runs), so a worker gets the same warm profiles run after run.
+
+`serve` binds to 127.0.0.1 unless --host is given; binding any other address
+requires a --token (or WORK_QUEUE_TOKEN), which workers then send as a bearer
+token.
+
+Backends share one interface (put / lease / ack / nack / extend / stats / ...):
+  SqliteQueue  local file (default work_queue.sqlite), safe for several processes
+  HttpQueue    client for `python work_queue.py serve`, which exposes a
+               SqliteQueue over HTTP so workers on other nodes can share it
+
+Usage:
+  python work_queue.py enqueue catalog_jobs.json
+  python work_queue.py worker --tabs 3                       # as many as you like
+  python work_queue.py serve --host 0.0.0.0 --token s3cret   # on the queue host
+  python work_queue.py worker --queue http://queue-host:8765 --token s3cret   # on other nodes
+  python work_queue.py status
+  python work_queue.py collect                               # -> one CSV per job
+"""
+
+import argparse
+import asyncio
+import fcntl
+import hmac
+import itertools
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from playwright.async_api import async_playwright
+
+from async_scraper import fetch_page, parse_page
+from browser_pool import PROFILE_ROOT, open_pool
+from crawl_scheduler import load_jobs
+from html_cache import HtmlCache
+from pagination import plan_pages
+from resource_policy import ResourcePolicy
+from row_sink import CsvSink
+from scrape_with_playwright import BASE_URL
+
+QUEUE_FILE = Path(__file__).resolve().parent / "work_queue.sqlite"
+DEFAULT_PORT = 8765
+DEFAULT_HOST = "127.0.0.1"
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',   -- pending | leased | done | skipped | dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL,
+    worker TEXT,
+    last_error TEXT,
+    result TEXT,
+    UNIQUE (label, page)
+)
+"""
+
+RATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_budget (
+    host TEXT PRIMARY KEY,
+    next_at REAL NOT NULL   -- when the next request could go out at the steady rate
+)
+"""
+
+
+class SqliteQueue:
+    """
+    Work units in a SQLite file. Every state change is one short IMMEDIATE
+    transaction, so several processes can share the file.
+    """
+
+    def __init__(self, path: Path = QUEUE_FILE, visibility_timeout: float = 300,
+                 max_attempts: int = 3, retry_delay: float = 30):
+        self.path = Path(path)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(SCHEMA)
+        self.db.execute(RATE_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _transaction(self, fn):
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self.db)
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+            return result
+
+    def put(self, units: List[Dict]) -> int:
+        """
+        Add {label, page, ...} units; ones already on the queue are left alone.
+        Returns how many were added.
+        """
+        def tx(db):
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO units (label, page, payload) VALUES (?, ?, ?)",
+                [(u["label"], u["page"], json.dumps(u)) for u in units],
+            )
+            return db.total_changes - before
+        return self._transaction(tx)
+
+    def lease(self, worker: str, n: int = 1) -> List[Dict]:
+        """
+        Lease up to n available units for visibility_timeout seconds.
+        Expired leases are returned to the queue (or dead-lettered) first.
+        Pages after 1 wait until their job's page 1 is done (or dead).
+        Each unit comes back as its payload plus "id" and "attempt".
+        """
+        def tx(db):
+            now = time.time()
+            db.execute(
+                "UPDATE units SET state = 'dead', last_error = 'lease expired' "
+                "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            db.execute(
+                "UPDATE units SET state = 'pending', worker = NULL, lease_until = NULL "
+                "WHERE state = 'leased' AND lease_until < ?",
+                (now,),
+            )
+            found = db.execute(
+                "SELECT id, payload, attempts FROM units AS u WHERE state = 'pending' AND available_at <= ? "
+                "AND (page = 1 OR NOT EXISTS (SELECT 1 FROM units AS first WHERE first.label = u.label "
+                "AND first.page = 1 AND first.state NOT IN ('done', 'dead'))) "
+                "ORDER BY page, id LIMIT ?",
+                (now, n),
+            ).fetchall()
+            for unit_id, _, _ in found:
+                db.execute(
+                    "UPDATE units SET state = 'leased', attempts = attempts + 1, lease_until = ?, worker = ? "
+                    "WHERE id = ?",
+                    (now + self.visibility_timeout, worker, unit_id),
+                )
+            return [{**json.loads(payload), "id": unit_id, "attempt": attempts + 1}
+                    for unit_id, payload, attempts in found]
+        return self._transaction(tx)
+
+    def extend(self, unit_id: int, worker: str) -> bool:
+        """
+        Push the lease out another visibility_timeout; False if it was lost
+        """
+        def tx(db):
+            cur = db.execute(
+                "UPDATE units SET lease_until = ? WHERE id = ? AND state = 'leased' AND worker = ?",
+                (time.time() + self.visibility_timeout, unit_id, worker),
+            )
+            return cur.rowcount == 1
+        return self._transaction(tx)
+
+    def ack(self, unit_id: int, worker: str, rows: List[Dict], last: bool = False,
+            pages: Optional[int] = None) -> bool:
+        """
+        Store a finished unit's rows. With last=True the job's later pages are
+        skipped; with pages=N (planned from page 1) those after page N are.
+        False if the lease had already expired and moved on.
+        """
+        def tx(db):
+            cur = db.execute(
+                "UPDATE units SET state = 'done', result = ?, lease_until = NULL, last_error = NULL "
+                "WHERE id = ? AND state = 'leased' AND worker = ?",
+                (json.dumps(rows), unit_id, worker),
+            )
+            if cur.rowcount != 1:
+                return False
+            label, page = db.execute("SELECT label, page FROM units WHERE id = ?", (unit_id,)).fetchone()
+            cutoffs = ([page] if last else []) + ([pages] if pages is not None else [])
+            if cutoffs:
+                db.execute(
+                    "UPDATE units SET state = 'skipped' WHERE state = 'pending' AND label = ? AND page > ?",
+                    (label, min(cutoffs)),
+                )
+            return True
+        return self._transaction(tx)
+
+    def nack(self, unit_id: int, worker: str, error: str) -> bool:
+        """
+        Give a unit back after a failure: retried after an exponential backoff,
+        or dead-lettered once it has used max_attempts
+        """
+        def tx(db):
+            found = db.execute(
+                "SELECT attempts FROM units WHERE id = ? AND state = 'leased' AND worker = ?",
+                (unit_id, worker),
+            ).fetchone()
+            if found is None:
+                return False
+            attempts = found[0]
+            if attempts >= self.max_attempts:
+                db.execute("UPDATE units SET state = 'dead', last_error = ?, lease_until = NULL WHERE id = ?",
+                           (error, unit_id))
+            else:
+                delay = self.retry_delay * 2 ** (attempts - 1)
+                db.execute(
+                    "UPDATE units SET state = 'pending', last_error = ?, lease_until = NULL, worker = NULL, "
+                    "available_at = ? WHERE id = ?",
+                    (error, time.time() + delay, unit_id),
+                )
+            return True
+        return self._transaction(tx)
+
+    def reserve(self, host: str, rate: float, burst: int = 1) -> float:
+        """
+        Book the next request slot for `host` in the budget every worker on this
+        queue shares: `rate` requests/second in total, bursts up to `burst`.
+        Returns the seconds the caller must wait before sending it.
+        """
+        interval = 1 / rate
+
+        def tx(db):
+            now = time.time()
+            found = db.execute("SELECT next_at FROM rate_budget WHERE host = ?", (host,)).fetchone()
+            next_at = max(found[0], now) if found else now
+            wait = max(0.0, next_at - (burst - 1) * interval - now)
+            db.execute("INSERT OR REPLACE INTO rate_budget (host, next_at) VALUES (?, ?)",
+                       (host, next_at + interval))
+            return wait
+        return self._transaction(tx)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self.db.execute("SELECT state, COUNT(*) FROM units GROUP BY state").fetchall())
+        return {state: counts.get(state, 0) for state in ("pending", "leased", "done", "skipped", "dead")}
+
+    def dead_letters(self) -> List[Dict]:
+        with self._lock:
+            found = self.db.execute(
+                "SELECT id, label, page, attempts, last_error FROM units WHERE state = 'dead' ORDER BY label, page"
+            ).fetchall()
+        return [dict(zip(("id", "label", "page", "attempts", "last_error"), row)) for row in found]
+
+    def requeue_dead(self) -> int:
+        """
+        Give every dead-lettered unit a fresh set of attempts
+        """
+        def tx(db):
+            return db.execute(
+                "UPDATE units SET state = 'pending', attempts = 0, available_at = 0 WHERE state = 'dead'"
+            ).rowcount
+        return self._transaction(tx)
+
+    def results(self) -> Dict[str, List[Dict]]:
+        """
+        {label: rows of its finished pages, in page order}
+        """
+        with self._lock:
+            found = self.db.execute(
+                "SELECT label, result FROM units WHERE state = 'done' ORDER BY label, page"
+            ).fetchall()
+        by_label: Dict[str, List[Dict]] = {}
+        for label, result in found:
+            by_label.setdefault(label, []).extend(json.loads(result))
+        return by_label
+
+    def clear(self) -> None:
+        self._transaction(lambda db: db.execute("DELETE FROM units"))
+
+    def close(self) -> None:
+        self.db.close()
+
+
+class HttpQueue:
+    """
+    Same interface as SqliteQueue, talking to a `work_queue.py serve` instance
+    """
+
+    def __init__(self, base_url: str, timeout: float = 30, token: Optional[str] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        token = token or os.environ.get("WORK_QUEUE_TOKEN")
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def _call(self, method: str, **kwargs):
+        response = self.session.post(f"{self.base_url}/{method}", json=kwargs, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["result"]
+
+    def put(self, units: List[Dict]) -> int:
+        return self._call("put", units=units)
+
+    def lease(self, worker: str, n: int = 1) -> List[Dict]:
+        return self._call("lease", worker=worker, n=n)
+
+    def extend(self, unit_id: int, worker: str) -> bool:
+        return self._call("extend", unit_id=unit_id, worker=worker)
+
+    def ack(self, unit_id: int, worker: str, rows: List[Dict], last: bool = False,
+            pages: Optional[int] = None) -> bool:
+        return self._call("ack", unit_id=unit_id, worker=worker, rows=rows, last=last, pages=pages)
+
+    def nack(self, unit_id: int, worker: str, error: str) -> bool:
+        return self._call("nack", unit_id=unit_id, worker=worker, error=error)
+
+    def reserve(self, host: str, rate: float, burst: int = 1) -> float:
+        return self._call("reserve", host=host, rate=rate, burst=burst)
+
+    def stats(self) -> Dict[str, int]:
+        return self._call("stats")
+
+    def dead_letters(self) -> List[Dict]:
+        return self._call("dead_letters")
+
+    def requeue_dead(self) -> int:
+        return self._call("requeue_dead")
+
+    def results(self) -> Dict[str, List[Dict]]:
+        return self._call("results")
+
+    def clear(self) -> None:
+        self._call("clear")
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# Methods HttpQueue may call on the server's SqliteQueue
+REMOTE_METHODS = {"put", "lease", "extend", "ack", "nack", "reserve", "stats", "dead_letters",
+                  "requeue_dead", "results", "clear"}
+
+
+def make_server(queue: SqliteQueue, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                token: Optional[str] = None) -> ThreadingHTTPServer:
+    """
+    HTTP front end for a SqliteQueue: POST /<method> with the keyword arguments
+    as a JSON body, answered with {"result": ...}. With a token, requests must
+    carry "Authorization: Bearer <token>"; without one, only local hosts may be bound.
+    """
+    if not token and host not in LOCAL_HOSTS:
+        raise ValueError(f"Refusing to serve the queue on {host} without a token")
+    expected = f"Bearer {token}" if token else None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if expected and not hmac.compare_digest(self.headers.get("Authorization", ""), expected):
+                self.send_error(401, "Bad or missing token")
+                return
+            method = self.path.strip("/")
+            if method not in REMOTE_METHODS:
+                self.send_error(404, f"Unknown method {method}")
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                kwargs = json.loads(self.rfile.read(length) or b"{}")
+                body = json.dumps({"result": getattr(queue, method)(**kwargs)}).encode("utf-8")
+            except Exception as e:
+                self.send_error(500, str(e))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def open_queue(target: Optional[str] = None, token: Optional[str] = None):
+    """
+    http(s)://... -> HttpQueue, anything else is a SqliteQueue file path
+    """
+    if target and target.startswith(("http://", "https://")):
+        return HttpQueue(target, token=token)
+    return SqliteQueue(Path(target) if target else QUEUE_FILE)
+
+
+def units_for_jobs(jobs: List[Dict]) -> List[Dict]:
+    """
+    One (query, page) unit per page of each crawl_scheduler job
+    """
+    return [
+        {"label": job["label"], "query": job["query"], "params": job["params"], "page": page_num}
+        for job in jobs
+        for page_num in range(1, job["max_pages"] + 1)
+    ]
+
+
+class SharedBucket:
+    """
+    acquire() like crawl_scheduler.TokenBucket, but the budget is booked in the queue
+    """
+
+    def __init__(self, queue, host: str, rate: float, burst: int):
+        self.queue = queue
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+
+    async def acquire(self) -> float:
+        wait = await asyncio.to_thread(self.queue.reserve, self.host, self.rate, self.burst)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class SharedRateLimiter:
+    """
+    for_url() like crawl_scheduler.HostRateLimiter: one SharedBucket per host
+    """
+
+    def __init__(self, queue, rate: float = 0.5, burst: int = 3):
+        self.queue = queue
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, SharedBucket] = {}
+
+    def for_url(self, url: str) -> SharedBucket:
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = SharedBucket(self.queue, host, self.rate, self.burst)
+        return self._buckets[host]
+
+
+@contextmanager
+def worker_slot(root: Path = PROFILE_ROOT / "workers") -> Iterator[Path]:
+    """
+    The first worker_N profile root under `root` that no other worker on this
+    machine holds; its lock is released when the block exits or the process dies
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    for n in itertools.count():
+        lock = open(root / f"worker_{n}.lock", "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            continue
+        try:
+            yield root / f"worker_{n}"
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+            lock.close()
+        return
+
+
+async def run_worker(queue, tabs: int = 2, rate: float = 0.5, burst: int = 3, headless: bool = True,
+                     poll_interval: float = 5.0, heartbeat: float = 60.0) -> Dict[str, int]:
+    """
+    Lease and crawl units on `tabs` browser contexts of this worker's own until
+    the queue has nothing pending or leased. rate/burst is the budget shared by
+    every worker on the queue; a unit's lease is extended every `heartbeat`
+    seconds (keep it well under the queue's visibility timeout) while it is
+    being crawled. Returns {"done": n, "failed": n}.
+    """
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"
+    limiter = SharedRateLimiter(queue, rate, burst)
+    policy = ResourcePolicy.load()
+    counts = {"done": 0, "failed": 0}
+
+    async def keep_leased(unit: Dict) -> None:
+        while True:
+            await asyncio.sleep(heartbeat)
+            if not await asyncio.to_thread(queue.extend, unit["id"], worker_name):
+                print(f"[{worker_name}] ⚠️ {unit['label']} p{unit['page']}: lost the lease")
+                return
+
+    async def crawl_unit(context, unit: Dict) -> None:
+        label, page_num = unit["label"], unit["page"]
+        try:
+            html = await fetch_page(context, page_num, limiter.for_url(BASE_URL), unit["query"],
+                                    unit["params"], policy, cache)
+            if html is None:
+                raise RuntimeError("results did not load")
+            rows, has_next = await asyncio.to_thread(parse_page, html, page_num)
+        except Exception as e:
+            counts["failed"] += 1
+            print(f"[{worker_name}] ❌ {label} p{page_num} (attempt {unit['attempt']}): {e}")
+            await asyncio.to_thread(queue.nack, unit["id"], worker_name, str(e))
+            return
+        # A page without results is done (and the job's last), not a failure
+        rows = rows or []
+        pages = plan_pages(html, unit["params"], sys.maxsize) if page_num == 1 else None
+        if pages is not None:
+            print(f"[{worker_name}] ✓ {label}: {pages} page(s) planned")
+        if not await asyncio.to_thread(queue.ack, unit["id"], worker_name, rows, not has_next, pages):
+            print(f"[{worker_name}] ⚠️ {label} p{page_num}: lease expired before ack, result dropped")
+            return
+        counts["done"] += 1
+        print(f"[{worker_name}] ✓ {label} p{page_num}: {len(rows)} items")
+
+    cache = HtmlCache()
+    try:
+        with worker_slot() as profile_root:
+            print(f"[{worker_name}] profiles in {profile_root}")
+            async with async_playwright() as p:
+                async with open_pool(p, size=tabs, headless=headless, profile_root=profile_root,
+                                     attach=False) as pool:
+
+                    async def tab() -> None:
+                        while True:
+                            units = await asyncio.to_thread(queue.lease, worker_name, 1)
+                            if not units:
+                                stats = await asyncio.to_thread(queue.stats)
+                                if stats["pending"] == 0 and stats["leased"] == 0:
+                                    return
+                                await asyncio.sleep(poll_interval)  # retries in backoff or other workers busy
+                                continue
+                            lease_keeper = asyncio.create_task(keep_leased(units[0]))
+                            try:
+                                async with pool.lease() as context:
+                                    await crawl_unit(context, units[0])
+                            finally:
+                                lease_keeper.cancel()
+
+                    await asyncio.gather(*(tab() for _ in range(tabs)))
+    finally:
+        cache.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared (query, page) work queue for distributed crawls.")
+    parser.add_argument("command", choices=["enqueue", "worker", "serve", "status", "collect", "requeue-dead"])
+    parser.add_argument("spec", nargs="?", help="Job spec for enqueue (see crawl_scheduler.py)")
+    parser.add_argument("--queue", type=str, default=None,
+                        help=f"SQLite file or http://host:port of a queue server (default: {QUEUE_FILE.name})")
+    parser.add_argument("--fresh", action="store_true", help="enqueue: drop every unit already on the queue")
+    parser.add_argument("--tabs", type=int, default=2, help="worker: browser contexts (default: 2)")
+    parser.add_argument("--rate", type=float, default=0.5,
+                        help="worker: requests/second per host, shared by all workers (default: 0.5)")
+    parser.add_argument("--burst", type=int, default=3, help="worker: token bucket burst size (default: 3)")
+    parser.add_argument("--headed", action="store_true", help="worker: show the browser windows")
+    parser.add_argument("--heartbeat", type=float, default=60.0,
+                        help="worker: seconds between lease extensions while a page is in progress (default: 60)")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST,
+                        help=f"serve: address to bind (default: {DEFAULT_HOST}; others need --token)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"serve: port (default: {DEFAULT_PORT})")
+    parser.add_argument("--token", type=str, default=os.environ.get("WORK_QUEUE_TOKEN"),
+                        help="serve/clients: shared secret for the HTTP queue (default: $WORK_QUEUE_TOKEN)")
+    parser.add_argument("--out-dir", type=str, default="crawl_output", help="collect: output directory")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        if not args.token and args.host not in LOCAL_HOSTS:
+            parser.error(f"serving on {args.host} needs --token (or WORK_QUEUE_TOKEN)")
+        queue = SqliteQueue(Path(args.queue) if args.queue else QUEUE_FILE)
+        server = make_server(queue, args.host, args.port, args.token)
+        print(f"✓ Serving {queue.path.name} on {args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+        queue.close()
+        return
+
+    queue = open_queue(args.queue, args.token)
+    if args.command == "enqueue":
+        if not args.spec:
+            parser.error("enqueue needs a job spec")
+        if args.fresh:
+            queue.clear()
+        units = units_for_jobs(load_jobs(Path(args.spec)))
+        added = queue.put(units)
+        print(f"✓ Queued {added} new units ({len(units) - added} already on the queue)")
+    elif args.command == "worker":
+        start = time.perf_counter()
+        counts = asyncio.run(run_worker(queue, args.tabs, args.rate, args.burst, headless=not args.headed,
+                                        heartbeat=args.heartbeat))
+        print(f"\n✓ Worker finished in {time.perf_counter() - start:.1f}s: "
+              f"{counts['done']} units done, {counts['failed']} failures")
+    elif args.command == "status":
+        print("  ".join(f"{state}: {n}" for state, n in queue.stats().items()))
+        for dead in queue.dead_letters():
+            print(f"  ☠ {dead['label']} p{dead['page']} after {dead['attempts']} attempts: {dead['last_error']}")
+    elif args.command == "requeue-dead":
+        print(f"✓ Requeued {queue.requeue_dead()} dead units")
+    elif args.command == "collect":
+        for label, rows in queue.results().items():
+            with CsvSink(Path(args.out_dir) / f"{label}.csv") as sink:
+                sink.write(rows)
+            print(f"  {label}: {sink.rows_written} items")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()